@@ -3,6 +3,8 @@ import math
 import sys
 import random
 import time
+from array import array
+from dataclasses import dataclass, field
 
 # ============================================================================
 #  Cat's SM64 Py Port 1.0
@@ -43,6 +45,36 @@ STATE_STAR_GET = 5
 STATE_PAUSE = 6
 STATE_GAME_OVER = 7
 
+# Controller buttons (bits of the mask built by read_buttons)
+BTN_LEFT = 0x001      # A - analog stick left
+BTN_RIGHT = 0x002     # D - analog stick right
+BTN_UP = 0x004        # W - analog stick up
+BTN_DOWN = 0x008      # S - analog stick down
+BTN_A = 0x010         # K / Space - jump
+BTN_B = 0x020         # J - punch / dive
+BTN_Z = 0x040         # Shift - crouch / ground pound
+BTN_C_LEFT = 0x080    # Left arrow / Q - camera left
+BTN_C_RIGHT = 0x100   # Right arrow / E - camera right
+
+_KEY_BUTTONS = (
+    (pygame.K_a, BTN_LEFT), (pygame.K_d, BTN_RIGHT),
+    (pygame.K_w, BTN_UP), (pygame.K_s, BTN_DOWN),
+    (pygame.K_k, BTN_A), (pygame.K_SPACE, BTN_A),
+    (pygame.K_j, BTN_B),
+    (pygame.K_LSHIFT, BTN_Z), (pygame.K_RSHIFT, BTN_Z),
+    (pygame.K_LEFT, BTN_C_LEFT), (pygame.K_q, BTN_C_LEFT),
+    (pygame.K_RIGHT, BTN_C_RIGHT), (pygame.K_e, BTN_C_RIGHT),
+)
+
+
+def read_buttons(keys):
+    """Fold the keyboard state from pygame.key.get_pressed() into a BTN_* mask"""
+    buttons = 0
+    for key, bit in _KEY_BUTTONS:
+        if keys[key]:
+            buttons |= bit
+    return buttons
+
 # --- Color Palette ---
 COL_MARIO_RED = (255, 20, 20)
 COL_MARIO_BLUE = (30, 30, 200)
@@ -284,6 +316,18 @@ def rotate_point_y(x, z, cx, cz, angle):
     return dx * cos_a - dz * sin_a + cx, dx * sin_a + dz * cos_a + cz
 
 
+_RING_DIRS = {}
+
+
+def ring_dirs(n):
+    """Unit (cos, sin) pairs for n evenly spaced angles, computed once per n"""
+    dirs = _RING_DIRS.get(n)
+    if dirs is None:
+        step = 2 * math.pi / n
+        dirs = _RING_DIRS[n] = tuple((math.cos(i * step), math.sin(i * step)) for i in range(n))
+    return dirs
+
+
 def lerp(a, b, t):
     return a + (b - a) * t
 
@@ -598,7 +642,8 @@ class Player(Object3D):
             return True  # Dead
         return False
 
-    def update(self, keys, map_objects, camera_angle, dt=1):
+    def update(self, buttons, map_objects, camera_angle, dt=1):
+        sin, cos = math.sin, math.cos
         if self.invincible_timer > 0:
             self.invincible_timer -= 1
 
@@ -607,10 +652,10 @@ class Player(Object3D):
         # LShift = Z Trigger (Crouch/Ground Pound/Long Jump)
         input_x = 0
         input_z = 0
-        if keys[pygame.K_a]: input_x -= 1
-        if keys[pygame.K_d]: input_x += 1
-        if keys[pygame.K_w]: input_z += 1
-        if keys[pygame.K_s]: input_z -= 1
+        if buttons & BTN_LEFT: input_x -= 1
+        if buttons & BTN_RIGHT: input_x += 1
+        if buttons & BTN_UP: input_z += 1
+        if buttons & BTN_DOWN: input_z -= 1
 
         is_moving = input_x != 0 or input_z != 0
 
@@ -639,8 +684,8 @@ class Player(Object3D):
                 turn_amount = max(-ROTATION_SPEED, min(ROTATION_SPEED, diff))
                 self.facing_angle += turn_amount
 
-                ax = math.sin(self.facing_angle) * ACCELERATION
-                az = math.cos(self.facing_angle) * ACCELERATION
+                ax = sin(self.facing_angle) * ACCELERATION
+                az = cos(self.facing_angle) * ACCELERATION
                 self.vel_x += ax
                 self.vel_z += az
             else:
@@ -664,7 +709,8 @@ class Player(Object3D):
         if self.jump_timer > 0:
             self.jump_timer -= 1
 
-        if (keys[pygame.K_k] or keys[pygame.K_SPACE]) and self.on_ground and not self.is_ground_pounding:
+        a_held = buttons & BTN_A
+        if a_held and self.on_ground and not self.is_ground_pounding:
             self.jump_count = self.jump_count + 1 if self.jump_timer > 0 else 1
             if self.jump_count >= 3:
                 self.vel_y = TRIPLE_JUMP_FORCE
@@ -677,12 +723,11 @@ class Player(Object3D):
             self.jump_timer = 20
 
         # Long Jump: Z(LShift) + A(K/Space) while running
-        z_held = keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]
-        a_held = keys[pygame.K_k] or keys[pygame.K_SPACE]
+        z_held = buttons & BTN_Z
         if z_held and a_held and self.on_ground and current_speed > 5:
             self.vel_y = LONG_JUMP_FORCE
-            boost_x = math.sin(self.facing_angle) * LONG_JUMP_BOOST
-            boost_z = math.cos(self.facing_angle) * LONG_JUMP_BOOST
+            boost_x = sin(self.facing_angle) * LONG_JUMP_BOOST
+            boost_z = cos(self.facing_angle) * LONG_JUMP_BOOST
             self.vel_x = boost_x
             self.vel_z = boost_z
             self.is_long_jumping = True
@@ -700,19 +745,19 @@ class Player(Object3D):
         # --- B Button (J) = Punch on ground, Dive in air ---
         if self.punch_timer > 0:
             self.punch_timer -= 1
-        if keys[pygame.K_j]:
+        if buttons & BTN_B:
             if self.on_ground and self.punch_timer <= 0:
                 self.is_punching = True
                 self.punch_timer = 15
                 # Small lunge forward
-                self.vel_x += math.sin(self.facing_angle) * 3
-                self.vel_z += math.cos(self.facing_angle) * 3
+                self.vel_x += sin(self.facing_angle) * 3
+                self.vel_z += cos(self.facing_angle) * 3
             elif not self.on_ground and not self.is_diving and not self.is_ground_pounding:
                 # Dive (belly slide)
                 self.is_diving = True
                 self.vel_y = -4
-                self.vel_x = math.sin(self.facing_angle) * MAX_SPEED * 1.2
-                self.vel_z = math.cos(self.facing_angle) * MAX_SPEED * 1.2
+                self.vel_x = sin(self.facing_angle) * MAX_SPEED * 1.2
+                self.vel_z = cos(self.facing_angle) * MAX_SPEED * 1.2
         if self.is_punching and self.punch_timer <= 0:
             self.is_punching = False
         if self.is_diving and self.on_ground:
@@ -776,6 +821,65 @@ class Player(Object3D):
 #  LEVEL BUILDER - Creates geometry for each level
 # ============================================================================
 
+@dataclass(slots=True)
+class LevelData:
+    """Everything build_level produces for one level"""
+    blocks: list = field(default_factory=list)
+    coins: list = field(default_factory=list)
+    stars: list = field(default_factory=list)
+    paintings: list = field(default_factory=list)
+    floor_color: tuple = COL_GRASS
+    sky_color: tuple = BG_COLOR
+    start_pos: tuple = (0, -50, 0)
+    # Flat x,y,z triples and alive flags mirroring 'coins'/'stars', for pickup tests
+    coin_xyz: array = field(default_factory=lambda: array('f'))
+    coin_alive: bytearray = field(default_factory=bytearray)
+    star_xyz: array = field(default_factory=lambda: array('f'))
+    star_alive: bytearray = field(default_factory=bytearray)
+    # World-space faces of 'blocks' (blocks never move), built on first render
+    block_faces: list = None
+
+
+def pack_xyz(objs):
+    """Flatten the positions of objs into one x,y,z,x,y,z... float array"""
+    xyz = array('f')
+    for o in objs:
+        xyz.extend((o.x, o.y, o.z))
+    return xyz
+
+
+def hits_within(xyz, alive, px, py, pz, radius):
+    """Indices of alive entries of a pack_xyz array closer than radius to (px, py, pz)"""
+    r2 = radius * radius
+    hits = []
+    for i in range(len(alive)):
+        if alive[i]:
+            j = i * 3
+            dx = px - xyz[j]
+            dy = py - xyz[j + 1]
+            dz = pz - xyz[j + 2]
+            if dx*dx + dy*dy + dz*dz < r2:
+                hits.append(i)
+    return hits
+
+
+def nearest_painting(paintings, x, z):
+    """Closest painting to (x, z) and its squared horizontal distance"""
+    best, best_d2 = None, float('inf')
+    for p in paintings:
+        dx = x - p.x
+        dz = z - p.z
+        d2 = dx*dx + dz*dz
+        if d2 < best_d2:
+            best, best_d2 = p, d2
+    return best, best_d2
+
+
+def add_blocks(blocks, positions, w, h, d, color):
+    """Append one w*h*d block of the given color at each (x, y, z) position"""
+    blocks.extend(LevelBlock(x, y, z, w, h, d, color) for x, y, z in positions)
+
+
 def build_level(level_id):
     """Build map objects, coins, stars, and start position for a level"""
     blocks = []
@@ -873,9 +977,8 @@ def build_level(level_id):
         for i in range(8):
             coins.append(Coin(20 + i * 10, -40 - i * 10, 200 + i * 70))
         # Red coins scattered
-        for i in range(8):
-            angle = i * math.pi / 4
-            coins.append(Coin(math.cos(angle) * 200, -10, math.sin(angle) * 200 + 400, 1))
+        for c, s in ring_dirs(8):
+            coins.append(Coin(c * 200, -10, s * 200 + 400, 1))
 
         # Stars
         stars.append(Star(0, -220, 750, 0))  # Summit
@@ -986,9 +1089,8 @@ def build_level(level_id):
         blocks.append(LevelBlock(-150, -80, -100, 20, 100, 60, COL_WOOD))
         blocks.append(LevelBlock(-150, -80, 50, 20, 100, 60, COL_WOOD))
 
-        for i in range(8):
-            angle = i * math.pi / 4
-            coins.append(Coin(math.cos(angle)*100, -10, math.sin(angle)*100))
+        for c, s in ring_dirs(8):
+            coins.append(Coin(c*100, -10, s*100))
         stars.append(Star(0, -200, 0, 0))
         stars.append(Star(0, 30, 0, 1))
         stars.append(Star(200, -200, 100, 2))
@@ -1172,12 +1274,9 @@ def build_level(level_id):
         # Base
         blocks.append(LevelBlock(0, 0, 0, 400, 20, 400, COL_GRASS))
         # Mountain spiral
-        for i in range(12):
-            angle = i * math.pi / 6
-            r = 200
-            x = math.cos(angle) * r
-            z = math.sin(angle) * r + 200
-            blocks.append(LevelBlock(x, -i*30 - 20, z, 80, 15, 80, COL_DIRT))
+        spiral = ring_dirs(12)
+        add_blocks(blocks, [(c*200, -i*30 - 20, s*200 + 200) for i, (c, s) in enumerate(spiral)],
+                   80, 15, 80, COL_DIRT)
         # Summit
         blocks.append(LevelBlock(0, -380, 200, 150, 20, 150, COL_STONE))
         # Mushroom platforms
@@ -1189,9 +1288,8 @@ def build_level(level_id):
         wb.is_water = True
         blocks.append(wb)
 
-        for i in range(12):
-            angle = i * math.pi / 6
-            coins.append(Coin(math.cos(angle)*200, -i*30-10, math.sin(angle)*200+200))
+        for i, (c, s) in enumerate(spiral):
+            coins.append(Coin(c*200, -i*30-10, s*200+200))
         stars.append(Star(0, -420, 200, 0))
         stars.append(Star(-250, -180, 200, 1))
         stars.append(Star(250, -140, 0, 2))
@@ -1310,20 +1408,48 @@ def build_level(level_id):
         floor_color = (30, 20, 40)
         start_pos = (0, -50, 0)
         blocks.append(LevelBlock(0, 0, 0, 150, 20, 150, COL_STONE))
-        for i in range(10):
-            angle = i * math.pi / 5
-            r = 200 + i * 20
-            blocks.append(LevelBlock(math.cos(angle)*r, -i*20, math.sin(angle)*r, 70, 15, 70, COL_PURPLE))
+        add_blocks(blocks, [(c*(200 + i*20), -i*20, s*(200 + i*20)) for i, (c, s) in enumerate(ring_dirs(10))],
+                   70, 15, 70, COL_PURPLE)
         blocks.append(LevelBlock(0, -200, 500, 250, 20, 250, (140, 40, 40)))
         stars.append(Star(0, -240, 500, 0))
 
-    return blocks, coins, stars, paintings, floor_color, sky_color, start_pos
+    return LevelData(blocks, coins, stars, paintings, floor_color, sky_color, start_pos,
+                     pack_xyz(coins), bytearray(b'\x01') * len(coins),
+                     pack_xyz(stars), bytearray(b'\x01') * len(stars))
 
 
 # ============================================================================
 #  RENDERER
 # ============================================================================
 
+_EDGE_COLORS = {}
+
+
+def draw_sorted_faces(surface, screen_faces):
+    """Draw depth-sorted (avg_z, color, points) faces back to front.
+
+    Consecutive faces that share a color (e.g. the sides of one block) are
+    drawn as a run so the fill and edge colors are only resolved once.
+    """
+    draw_polygon = pygame.draw.polygon
+    n = len(screen_faces)
+    i = 0
+    while i < n:
+        color = screen_faces[i][1]
+        edge = _EDGE_COLORS.get(color)
+        if edge is None:
+            edge = _EDGE_COLORS[color] = tuple(max(0, c - 30) for c in color)
+        j = i
+        while j < n and screen_faces[j][1] == color:
+            points = screen_faces[j][2]
+            if len(points) >= 3:
+                draw_polygon(surface, color, points)
+                # Edge lines for depth
+                draw_polygon(surface, edge, points, 1)
+            j += 1
+        i = j
+
+
 class Renderer:
     def __init__(self, screen):
         self.screen = screen
@@ -1351,47 +1477,43 @@ class Renderer:
                 screen_faces.append((avg_z, face.color, pts))
 
         screen_faces.sort(key=lambda x: x[0], reverse=True)
-
-        for _, color, points in screen_faces:
-            if len(points) >= 3:
-                pygame.draw.polygon(self.screen, color, points)
-                # Edge lines for depth
-                pygame.draw.polygon(self.screen, tuple(max(0, c-30) for c in color), points, 1)
+        draw_sorted_faces(self.screen, screen_faces)
 
 
-def render_scene(screen, player, map_objects, coins, stars, paintings, floor_color,
-                 camera_pos, cam_angle, game_time):
+def render_scene(screen, player, level, camera_pos, cam_angle, game_time):
     render_yaw = -cam_angle
     render_list = []
 
     # Player faces
+    cos_f, sin_f = math.cos(player.facing_angle), math.sin(player.facing_angle)
     for face in player.faces:
         world_verts = []
         for v in face.vertices:
-            rx, rz = rotate_point_y(v.x, v.z, 0, 0, player.facing_angle)
+            rx = v.x * cos_f - v.z * sin_f
+            rz = v.x * sin_f + v.z * cos_f
             world_verts.append(Vector3(rx + player.x, v.y + player.y, rz + player.z))
         render_list.append(Face(world_verts, face.color))
 
     # Map faces
-    for obj in map_objects:
-        for face in obj.faces:
-            world_verts = []
-            for v in face.vertices:
-                world_verts.append(Vector3(v.x + obj.x, v.y + obj.y, v.z + obj.z))
-            render_list.append(Face(world_verts, face.color))
+    if level.block_faces is None:
+        level.block_faces = [
+            Face([Vector3(v.x + obj.x, v.y + obj.y, v.z + obj.z) for v in face.vertices], face.color)
+            for obj in level.blocks for face in obj.faces
+        ]
+    render_list.extend(level.block_faces)
 
     # Coins
-    for coin in coins:
+    for coin in level.coins:
         for face in coin.get_faces(game_time):
             render_list.append(face)
 
     # Stars
-    for star in stars:
+    for star in level.stars:
         for face in star.get_faces(game_time):
             render_list.append(face)
 
     # Paintings
-    for painting in paintings:
+    for painting in level.paintings:
         for face in painting.get_faces(game_time):
             render_list.append(face)
 
@@ -1399,18 +1521,21 @@ def render_scene(screen, player, map_objects, coins, stars, paintings, floor_col
     render_list.append(Face([
         Vector3(-3000, 0, -3000), Vector3(3000, 0, -3000),
         Vector3(3000, 0, 3000), Vector3(-3000, 0, 3000)
-    ], floor_color))
+    ], level.floor_color))
 
     # Project and draw
+    cos_y, sin_y = math.cos(render_yaw), math.sin(render_yaw)
+    cam_x, cam_y, cam_z = camera_pos.x, camera_pos.y, camera_pos.z
     screen_faces = []
     for face in render_list:
         cam_verts = []
         in_front = True
         for v in face.vertices:
-            x = v.x - camera_pos.x
-            y = v.y - camera_pos.y
-            z = v.z - camera_pos.z
-            rx, rz = rotate_point_y(x, z, 0, 0, render_yaw)
+            x = v.x - cam_x
+            y = v.y - cam_y
+            z = v.z - cam_z
+            rx = x * cos_y - z * sin_y
+            rz = x * sin_y + z * cos_y
             if rz <= 1:
                 in_front = False
                 break
@@ -1424,11 +1549,63 @@ def render_scene(screen, player, map_objects, coins, stars, paintings, floor_col
             screen_faces.append((avg_z, face.color, pts))
 
     screen_faces.sort(key=lambda x: x[0], reverse=True)
-    for _, color, points in screen_faces:
-        if len(points) >= 3:
-            pygame.draw.polygon(screen, color, points)
-            edge = tuple(max(0, c - 30) for c in color)
-            pygame.draw.polygon(screen, edge, points, 1)
+    draw_sorted_faces(screen, screen_faces)
+
+
+# ============================================================================
+#  TEXT CACHE
+# ============================================================================
+
+TEXT_CACHE_TTL = 600  # Frames an unused string survives in the cache
+
+_TEXT_CACHE = {}      # (id(font), text, color) -> rendered Surface
+_TEXT_LAST_USED = {}  # same key -> text clock value of the last lookup
+_text_clock = 0
+
+
+def rtext(font, text, color):
+    """font.render(text, True, color), reusing the Surface from earlier frames"""
+    key = (id(font), text, color)
+    surf = _TEXT_CACHE.get(key)
+    if surf is None:
+        surf = _TEXT_CACHE[key] = font.render(text, True, color).convert_alpha()
+    _TEXT_LAST_USED[key] = _text_clock
+    return surf
+
+
+_HUD_SLOTS = {}  # slot name -> (font, values, color, Surface)
+
+
+def hud_text(slot, font, fmt, values, color):
+    """rtext() of fmt.format(*values) that only re-formats when values change"""
+    cached = _HUD_SLOTS.get(slot)
+    if cached is not None and cached[0] is font and cached[1] == values and cached[2] == color:
+        return cached[3]
+    surf = rtext(font, fmt.format(*values), color)
+    _HUD_SLOTS[slot] = (font, values, color, surf)
+    return surf
+
+
+def text_cache_tick():
+    """Advance the text cache clock once per frame and evict stale strings"""
+    global _text_clock
+    _text_clock += 1
+    if _text_clock % TEXT_CACHE_TTL == 0:
+        cutoff = _text_clock - TEXT_CACHE_TTL
+        for key in [k for k, t in _TEXT_LAST_USED.items() if t < cutoff]:
+            del _TEXT_CACHE[key]
+            del _TEXT_LAST_USED[key]
+
+
+_HAS_FBLITS = hasattr(pygame.Surface, 'fblits')  # pygame-ce only
+
+
+def blit_all(surface, jobs):
+    """Blit a list of (Surface, (x, y)) pairs in one call"""
+    if _HAS_FBLITS:
+        surface.fblits(jobs)
+    else:
+        surface.blits(jobs, doreturn=False)
 
 
 # ============================================================================
@@ -1437,133 +1614,190 @@ def render_scene(screen, player, map_objects, coins, stars, paintings, floor_col
 
 def draw_hud(screen, player, level_id, font_large, font_small, show_star_name=None, star_name_timer=0):
     # Star count - top left
-    star_icon = "★"
-    star_text = f"{star_icon} x {player.total_stars}"
-    surf = font_large.render(star_text, True, COL_GOLD)
-    screen.blit(surf, (20, 15))
+    surf = hud_text('stars', font_large, "★ x {}", (player.total_stars,), COL_GOLD)
+    jobs = [(surf, (20, 15))]
 
     # Coin count
-    coin_text = f"Coins: {player.coins}"
-    surf2 = font_small.render(coin_text, True, COL_COIN)
-    screen.blit(surf2, (20, 50))
+    surf2 = hud_text('coins', font_small, "Coins: {}", (player.coins,), COL_COIN)
+    jobs.append((surf2, (20, 50)))
 
     # Lives
-    lives_text = f"Lives x {player.lives}"
-    surf3 = font_small.render(lives_text, True, (255, 255, 255))
-    screen.blit(surf3, (20, 70))
+    surf3 = hud_text('lives', font_small, "Lives x {}", (player.lives,), (255, 255, 255))
+    jobs.append((surf3, (20, 70)))
 
     # Health meter (SM64 pie chart style - simplified as bar)
     health_x, health_y = WIDTH - 180, 20
     pygame.draw.rect(screen, (40, 40, 40), (health_x - 2, health_y - 2, 164, 24))
     bar_w = int(160 * (player.health / player.max_health))
-    bar_color = (50, 200, 50) if player.health > 3 else (200, 200, 50) if player.health > 1 else (200, 50, 50)
-    pygame.draw.rect(screen, bar_color, (health_x, health_y, bar_w, 20))
-    hp_text = font_small.render(f"Power: {player.health}/{player.max_health}", True, (255, 255, 255))
-    screen.blit(hp_text, (health_x, health_y + 22))
+    if bar_w > 0:
+        bar_color = (50, 200, 50) if player.health > 3 else (200, 200, 50) if player.health > 1 else (200, 50, 50)
+        pygame.draw.rect(screen, bar_color, (health_x, health_y, bar_w, 20))
+    hp_text = hud_text('power', font_small, "Power: {}/{}", (player.health, player.max_health), (255, 255, 255))
+    jobs.append((hp_text, (health_x, health_y + 22)))
 
     # Level name - top center
     name = LEVEL_NAMES.get(level_id, "Unknown")
-    name_surf = font_small.render(name, True, (255, 255, 255))
-    screen.blit(name_surf, (WIDTH // 2 - name_surf.get_width() // 2, 10))
+    name_surf = rtext(font_small, name, (255, 255, 255))
+    jobs.append((name_surf, (WIDTH // 2 - name_surf.get_width() // 2, 10)))
 
     # Star acquisition message
     if show_star_name and star_name_timer > 0:
-        alpha = min(255, star_name_timer * 4)
-        star_surf = font_large.render(f"★ {show_star_name} ★", True, COL_GOLD)
+        star_surf = hud_text('star_name', font_large, "★ {} ★", (show_star_name,), COL_GOLD)
         x = WIDTH // 2 - star_surf.get_width() // 2
         y = HEIGHT // 3
-        screen.blit(star_surf, (x, y))
+        jobs.append((star_surf, (x, y)))
+
+    blit_all(screen, jobs)
+
+
+CONTROLS_HELP = (
+    "WASD: Move (Analog Stick)",
+    "K / Space: Jump [A] (1x/2x/3x)",
+    "J: Punch / Dive [B]",
+    "L Shift: Crouch / Z-Trigger",
+    "L Shift + Jump: Long Jump",
+    "L Shift (air): Ground Pound",
+    "Mouse / Arrow Keys: Camera (C-Buttons)",
+    "Enter: Interact / Enter Painting",
+    "ESC: Pause",
+    "F1: Toggle Mouse Capture",
+)
+_controls_help_surfs = {}  # id(font) -> pre-rendered controls block
 
 
 def draw_controls_help(screen, font):
-    controls = [
-        "WASD: Move (Analog Stick)",
-        "K / Space: Jump [A] (1x/2x/3x)",
-        "J: Punch / Dive [B]",
-        "L Shift: Crouch / Z-Trigger",
-        "L Shift + Jump: Long Jump",
-        "L Shift (air): Ground Pound",
-        "Mouse / Arrow Keys: Camera (C-Buttons)",
-        "Enter: Interact / Enter Painting",
-        "ESC: Pause",
-        "F1: Toggle Mouse Capture",
-    ]
-    y = HEIGHT - len(controls) * 18 - 10
-    for line in controls:
-        surf = font.render(line, True, (200, 200, 200))
-        screen.blit(surf, (10, y))
-        y += 18
+    block = _controls_help_surfs.get(id(font))
+    if block is None:
+        lines = [font.render(line, True, (200, 200, 200)) for line in CONTROLS_HELP]
+        size = (max(l.get_width() for l in lines), (len(lines) - 1) * 18 + lines[-1].get_height())
+        block = pygame.Surface(size, pygame.SRCALPHA)
+        block.blits([(l, (0, i * 18)) for i, l in enumerate(lines)], doreturn=False)
+        _controls_help_surfs[id(font)] = block.convert_alpha()
+    screen.blit(block, (10, HEIGHT - len(CONTROLS_HELP) * 18 - 10))
 
 
 # ============================================================================
 #  TITLE SCREEN & MENUS
 # ============================================================================
 
+_title_bg = None
+
+# Background star positions (fixed seed so the sky is the same every run)
+_star_rng = random.Random(42)
+_TITLE_STARS = tuple((_star_rng.randint(0, WIDTH), _star_rng.randint(0, HEIGHT // 2))
+                     for _ in range(50))
+del _star_rng
+
+
+def compute_title_gradient(out):
+    """Write the title-sky column (HEIGHT RGB triples, top to bottom) into out"""
+    out[0::3] = bytes([int(20 + 80 * (y / HEIGHT)) for y in range(HEIGHT)])
+    out[1::3] = bytes([int(30 + 100 * (y / HEIGHT)) for y in range(HEIGHT)])
+    out[2::3] = bytes([int(120 + 120 * (y / HEIGHT)) for y in range(HEIGHT)])
+
+
+def get_title_bg():
+    """The title-screen sky gradient, drawn once and reused every frame"""
+    global _title_bg
+    if _title_bg is None:
+        column = bytearray(HEIGHT * 3)
+        compute_title_gradient(column)
+        strip = pygame.image.frombuffer(column, (1, HEIGHT), 'RGB')
+        _title_bg = pygame.transform.scale(strip, (WIDTH, HEIGHT)).convert()
+    return _title_bg
+
+
+_star_dots = {}  # brightness -> radius-2 dot sprite
+
+
+def get_star_dot(brightness):
+    """A 5x5 sprite of a radius-2 grey dot, cached per brightness level"""
+    dot = _star_dots.get(brightness)
+    if dot is None:
+        dot = pygame.Surface((5, 5), pygame.SRCALPHA)
+        pygame.draw.circle(dot, (brightness, brightness, brightness), (2, 2), 2)
+        dot = _star_dots[brightness] = dot.convert_alpha()
+    return dot
+
+
+_mario_face = None
+
+
+def get_mario_face():
+    """The title-screen Mario face, drawn once into an 80x60 sprite"""
+    global _mario_face
+    if _mario_face is None:
+        face = pygame.Surface((80, 60), pygame.SRCALPHA)
+        cx, cy = 40, 40
+        # Hat
+        pygame.draw.rect(face, COL_MARIO_RED, (cx - 30, cy - 40, 60, 20))
+        pygame.draw.rect(face, COL_MARIO_RED, (cx - 40, cy - 30, 80, 10))
+        # Face
+        pygame.draw.rect(face, COL_MARIO_SKIN, (cx - 30, cy - 20, 60, 40))
+        # Eyes
+        pygame.draw.rect(face, (255, 255, 255), (cx - 20, cy - 15, 12, 12))
+        pygame.draw.rect(face, (255, 255, 255), (cx + 8, cy - 15, 12, 12))
+        pygame.draw.rect(face, (0, 0, 0), (cx - 16, cy - 12, 6, 6))
+        pygame.draw.rect(face, (0, 0, 0), (cx + 12, cy - 12, 6, 6))
+        # Mustache
+        pygame.draw.rect(face, (60, 30, 10), (cx - 25, cy + 5, 50, 8))
+        # Nose
+        pygame.draw.rect(face, COL_MARIO_SKIN, (cx - 8, cy - 5, 16, 14))
+        _mario_face = face.convert_alpha()
+    return _mario_face
+
+
 def draw_title_screen(screen, font_title, font_large, font_small, frame):
     # Sky gradient
-    for y in range(HEIGHT):
-        r = int(20 + 80 * (y / HEIGHT))
-        g = int(30 + 100 * (y / HEIGHT))
-        b = int(120 + 120 * (y / HEIGHT))
-        pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y))
+    screen.blit(get_title_bg(), (0, 0))
+
+    sin = math.sin
 
     # Animated stars in background
-    random.seed(42)
-    for i in range(50):
-        sx = random.randint(0, WIDTH)
-        sy = random.randint(0, HEIGHT // 2)
-        brightness = int(150 + 100 * math.sin(frame * 0.05 + i))
+    jobs = []
+    for i, (sx, sy) in enumerate(_TITLE_STARS):
+        brightness = int(150 + 100 * sin(frame * 0.05 + i))
         brightness = max(50, min(255, brightness))
-        pygame.draw.circle(screen, (brightness, brightness, brightness), (sx, sy), 2)
+        jobs.append((get_star_dot(brightness), (sx - 2, sy - 2)))
+    blit_all(screen, jobs)
 
     # Title
-    bob = math.sin(frame * 0.03) * 10
-    title1 = font_title.render("Cat's SM64", True, COL_GOLD)
-    title2 = font_large.render("Python Port 1.0", True, (255, 255, 200))
+    bob = sin(frame * 0.03) * 10
+    title1 = rtext(font_title, "Cat's SM64", COL_GOLD)
+    title2 = rtext(font_large, "Python Port 1.0", (255, 255, 200))
 
     # Shadow
-    screen.blit(font_title.render("Cat's SM64", True, (80, 60, 0)),
-                (WIDTH // 2 - title1.get_width() // 2 + 3, int(100 + bob + 3)))
-    screen.blit(title1, (WIDTH // 2 - title1.get_width() // 2, int(100 + bob)))
-    screen.blit(title2, (WIDTH // 2 - title2.get_width() // 2, int(170 + bob)))
+    jobs = [
+        (rtext(font_title, "Cat's SM64", (80, 60, 0)),
+         (WIDTH // 2 - title1.get_width() // 2 + 3, int(100 + bob + 3))),
+        (title1, (WIDTH // 2 - title1.get_width() // 2, int(100 + bob))),
+        (title2, (WIDTH // 2 - title2.get_width() // 2, int(170 + bob))),
+    ]
 
     # Copyright
-    copy1 = font_small.render("© Nintendo 1996-2026", True, (180, 180, 180))
-    copy2 = font_small.render("© AC Corp 1999-2026", True, (180, 180, 180))
-    screen.blit(copy1, (WIDTH // 2 - copy1.get_width() // 2, 220))
-    screen.blit(copy2, (WIDTH // 2 - copy2.get_width() // 2, 240))
+    copy1 = rtext(font_small, "© Nintendo 1996-2026", (180, 180, 180))
+    copy2 = rtext(font_small, "© AC Corp 1999-2026", (180, 180, 180))
+    jobs.append((copy1, (WIDTH // 2 - copy1.get_width() // 2, 220)))
+    jobs.append((copy2, (WIDTH // 2 - copy2.get_width() // 2, 240)))
 
     # Blinking prompt
     if (frame // 40) % 2 == 0:
-        prompt = font_large.render("Press ENTER to Start", True, (255, 255, 255))
-        screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, 350))
-
-    # Mario face (simple pixel art)
-    cx, cy = WIDTH // 2, 450
-    # Hat
-    pygame.draw.rect(screen, COL_MARIO_RED, (cx - 30, cy - 40, 60, 20))
-    pygame.draw.rect(screen, COL_MARIO_RED, (cx - 40, cy - 30, 80, 10))
-    # Face
-    pygame.draw.rect(screen, COL_MARIO_SKIN, (cx - 30, cy - 20, 60, 40))
-    # Eyes
-    pygame.draw.rect(screen, (255, 255, 255), (cx - 20, cy - 15, 12, 12))
-    pygame.draw.rect(screen, (255, 255, 255), (cx + 8, cy - 15, 12, 12))
-    pygame.draw.rect(screen, (0, 0, 0), (cx - 16, cy - 12, 6, 6))
-    pygame.draw.rect(screen, (0, 0, 0), (cx + 12, cy - 12, 6, 6))
-    # Mustache
-    pygame.draw.rect(screen, (60, 30, 10), (cx - 25, cy + 5, 50, 8))
-    # Nose
-    pygame.draw.rect(screen, COL_MARIO_SKIN, (cx - 8, cy - 5, 16, 14))
+        prompt = rtext(font_large, "Press ENTER to Start", (255, 255, 255))
+        jobs.append((prompt, (WIDTH // 2 - prompt.get_width() // 2, 350)))
 
     # Version info
-    ver = font_small.render("v1.0 - SM64 PC Port Controls | All 15 Courses + Castle + Bowser", True, (120, 120, 150))
-    screen.blit(ver, (WIDTH // 2 - ver.get_width() // 2, HEIGHT - 30))
+    ver = rtext(font_small, "v1.0 - SM64 PC Port Controls | All 15 Courses + Castle + Bowser", (120, 120, 150))
+    jobs.append((ver, (WIDTH // 2 - ver.get_width() // 2, HEIGHT - 30)))
+    blit_all(screen, jobs)
+
+    # Mario face (simple pixel art)
+    screen.blit(get_mario_face(), (WIDTH // 2 - 40, 450 - 40))
 
 
 def draw_file_select(screen, font_title, font_large, font_small, selected, frame):
     screen.fill((40, 30, 60))
 
-    title = font_title.render("Select File", True, COL_GOLD)
+    title = rtext(font_title, "Select File", COL_GOLD)
     screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 40))
 
     files = ["File A - Mario", "File B - Luigi", "File C - Wario", "File D - Toad"]
@@ -1574,10 +1808,10 @@ def draw_file_select(screen, font_title, font_large, font_small, selected, frame
         pygame.draw.rect(screen, bg_color, (WIDTH // 2 - 150, y - 5, 300, 50), border_radius=8)
         if i == selected:
             pygame.draw.rect(screen, COL_GOLD, (WIDTH // 2 - 150, y - 5, 300, 50), 2, border_radius=8)
-        text = font_large.render(name, True, color)
+        text = rtext(font_large, name, color)
         screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y + 8))
 
-    inst = font_small.render("↑↓ Select  |  Enter: Choose  |  Stars: 0", True, (150, 150, 180))
+    inst = rtext(font_small, "↑↓ Select  |  Enter: Choose  |  Stars: 0", (150, 150, 180))
     screen.blit(inst, (WIDTH // 2 - inst.get_width() // 2, HEIGHT - 40))
 
 
@@ -1604,98 +1838,148 @@ def draw_letter_screen(screen, font_large, font_small, frame):
         color = (80, 40, 20)
         if "Peach" in line:
             color = (200, 80, 120)
-        surf = font_large.render(line, True, color)
+        surf = rtext(font_large, line, color)
         screen.blit(surf, (100, y))
         y += 40
 
     # Seal
     pygame.draw.circle(screen, (200, 50, 50), (WIDTH - 120, HEIGHT - 120), 30)
     pygame.draw.circle(screen, (220, 80, 80), (WIDTH - 120, HEIGHT - 120), 25)
-    seal = font_small.render("♛", True, (255, 200, 50))
+    seal = rtext(font_small, "♛", (255, 200, 50))
     screen.blit(seal, (WIDTH - 128, HEIGHT - 130))
 
     if (frame // 30) % 2 == 0:
-        prompt = font_small.render("Press ENTER to continue...", True, (100, 70, 40))
+        prompt = rtext(font_small, "Press ENTER to continue...", (100, 70, 40))
         screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT - 60))
 
 
+_pause_overlay = None
+_label_bgs = {}  # (w, h) -> translucent label backdrop
+
+
+def get_label_bg(w, h):
+    """A translucent black w*h backdrop for on-screen labels, cached per size"""
+    bg = _label_bgs.get((w, h))
+    if bg is None:
+        bg = pygame.Surface((w, h), pygame.SRCALPHA).convert_alpha()
+        bg.fill((0, 0, 0, 150))
+        _label_bgs[(w, h)] = bg
+    return bg
+
+
 def draw_pause_screen(screen, font_title, font_large, font_small, player, selected):
     # Overlay
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 150))
-    screen.blit(overlay, (0, 0))
+    global _pause_overlay
+    if _pause_overlay is None:
+        _pause_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
+        _pause_overlay.fill((0, 0, 0, 150))
+    screen.blit(_pause_overlay, (0, 0))
 
-    title = font_title.render("PAUSE", True, (255, 255, 255))
-    screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 60))
+    title = rtext(font_title, "PAUSE", (255, 255, 255))
+    jobs = [(title, (WIDTH // 2 - title.get_width() // 2, 60))]
 
     # Star display
-    star_text = font_large.render(f"★ Total Stars: {player.total_stars} / 120", True, COL_GOLD)
-    screen.blit(star_text, (WIDTH // 2 - star_text.get_width() // 2, 130))
+    star_text = hud_text('pause_stars', font_large, "★ Total Stars: {} / 120", (player.total_stars,), COL_GOLD)
+    jobs.append((star_text, (WIDTH // 2 - star_text.get_width() // 2, 130)))
 
     options = ["Continue", "Exit to Castle", "Exit to Title"]
     for i, opt in enumerate(options):
         y = 220 + i * 60
-        color = COL_GOLD if i == selected else (200, 200, 200)
-        text = font_large.render(opt, True, color)
         if i == selected:
-            text = font_large.render(f"> {opt} <", True, color)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y))
+            text = rtext(font_large, f"> {opt} <", COL_GOLD)
+        else:
+            text = rtext(font_large, opt, (200, 200, 200))
+        jobs.append((text, (WIDTH // 2 - text.get_width() // 2, y)))
 
     # Course stars breakdown
     y_off = 420
-    course_text = font_small.render("Course Stars:", True, (180, 180, 180))
-    screen.blit(course_text, (50, y_off))
+    course_text = rtext(font_small, "Course Stars:", (180, 180, 180))
+    jobs.append((course_text, (50, y_off)))
     y_off += 20
     col = 0
     for lid in range(15):
+        x_pos = 50 + col * 250
+        if x_pos >= WIDTH:
+            break  # Remaining columns would be off-screen
         name = LEVEL_NAMES.get(lid, "?")
-        count = len(player.stars_collected.get(lid, set()))
+        count = len(player.stars_collected.get(lid, ()))
         short_name = name[:20]
-        info = font_small.render(f"{short_name}: {count}/7", True, (150, 150, 150))
-        x_pos = 50 + col * 250
-        screen.blit(info, (x_pos, y_off))
+        info = rtext(font_small, f"{short_name}: {count}/7", (150, 150, 150))
+        jobs.append((info, (x_pos, y_off)))
         y_off += 16
         if y_off > HEIGHT - 30:
             y_off = 440
             col += 1
+    blit_all(screen, jobs)
+
+
+# (cos, sin) of the per-row phase y*0.01 used by the star-get background;
+# sin(a + y*0.01) = sin(a)*cos(y*0.01) + cos(a)*sin(y*0.01)
+_ROW_CS = tuple((math.cos(y * 0.01), math.sin(y * 0.01)) for y in range(HEIGHT))
+_grad_buf = bytearray(HEIGHT * 3)  # 1 x HEIGHT RGB column
+_grad_strip = None
+_grad_full = None
+
+
+def compute_star_get_gradient(frame, out):
+    """Write this frame's star-get background column (HEIGHT RGB triples) into out"""
+    sin, cos = math.sin, math.cos
+    sr, cr = 40 * sin(frame * 0.02), 40 * cos(frame * 0.02)
+    sg, cg = 30 * sin(frame * 0.03), 30 * cos(frame * 0.03)
+    sb, cb = 60 * sin(frame * 0.01), 60 * cos(frame * 0.01)
+    # Red and green can dip below zero; blue stays within 20..140
+    out[0::3] = bytes([max(0, int(20 + sr * c + cr * s)) for c, s in _ROW_CS])
+    out[1::3] = bytes([max(0, int(20 + sg * c + cg * s)) for c, s in _ROW_CS])
+    out[2::3] = bytes([int(80 + sb * c + cb * s) for c, s in _ROW_CS])
+
+
+def draw_star_get_gradient(screen, frame):
+    """Fill screen with the animated star-get gradient using one scale and one blit"""
+    global _grad_strip, _grad_full
+    if _grad_strip is None:
+        _grad_strip = pygame.image.frombuffer(_grad_buf, (1, HEIGHT), 'RGB')
+        _grad_full = pygame.Surface((WIDTH, HEIGHT), 0, _grad_strip)
+    compute_star_get_gradient(frame, _grad_buf)
+    pygame.transform.scale(_grad_strip, (WIDTH, HEIGHT), _grad_full)
+    screen.blit(_grad_full, (0, 0))
+
+
+# Unit directions of the 10 star-polygon points, alternating outer/inner
+_STAR_DIRS = tuple((math.cos(i * math.pi / 5 - math.pi / 2), math.sin(i * math.pi / 5 - math.pi / 2), i % 2 == 0)
+                   for i in range(10))
 
 
 def draw_star_get_screen(screen, font_title, font_large, font_small, star_name, frame, level_id):
     # Celebration screen
-    for y in range(HEIGHT):
-        r = int(20 + 40 * math.sin(frame * 0.02 + y * 0.01))
-        g = int(20 + 30 * math.sin(frame * 0.03 + y * 0.01))
-        b = int(80 + 60 * math.sin(frame * 0.01 + y * 0.01))
-        r, g, b = max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
-        pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y))
+    draw_star_get_gradient(screen, frame)
+
+    sin = math.sin
 
     # Big star
-    bob = math.sin(frame * 0.05) * 20
-    star_size = 60 + int(math.sin(frame * 0.1) * 10)
+    bob = sin(frame * 0.05) * 20
+    star_size = 60 + int(sin(frame * 0.1) * 10)
     cx, cy = WIDTH // 2, int(200 + bob)
 
     # Draw star shape
-    points = []
-    for i in range(10):
-        angle = i * math.pi / 5 - math.pi / 2
-        r = star_size if i % 2 == 0 else star_size // 2
-        points.append((cx + int(math.cos(angle) * r), cy + int(math.sin(angle) * r)))
+    inner = star_size // 2
+    points = [(cx + int(dx * (star_size if outer else inner)), cy + int(dy * (star_size if outer else inner)))
+              for dx, dy, outer in _STAR_DIRS]
     pygame.draw.polygon(screen, COL_GOLD, points)
     pygame.draw.polygon(screen, (255, 240, 150), points, 2)
 
     # Course complete
     level_name = LEVEL_NAMES.get(level_id, "Unknown")
-    course = font_large.render(f"Course: {level_name}", True, (200, 200, 255))
+    course = rtext(font_large, f"Course: {level_name}", (200, 200, 255))
     screen.blit(course, (WIDTH // 2 - course.get_width() // 2, 320))
 
-    got = font_title.render("GOT A STAR!", True, COL_GOLD)
+    got = rtext(font_title, "GOT A STAR!", COL_GOLD)
     screen.blit(got, (WIDTH // 2 - got.get_width() // 2, 370))
 
-    name_surf = font_large.render(star_name, True, (255, 255, 200))
+    name_surf = rtext(font_large, star_name, (255, 255, 200))
     screen.blit(name_surf, (WIDTH // 2 - name_surf.get_width() // 2, 430))
 
     if frame > 60 and (frame // 25) % 2 == 0:
-        cont = font_small.render("Press ENTER to continue", True, (200, 200, 200))
+        cont = rtext(font_small, "Press ENTER to continue", (200, 200, 200))
         screen.blit(cont, (WIDTH // 2 - cont.get_width() // 2, HEIGHT - 50))
 
 
@@ -1703,11 +1987,11 @@ def draw_game_over(screen, font_title, font_large, font_small, frame):
     screen.fill((0, 0, 0))
     bob = math.sin(frame * 0.03) * 5
 
-    title = font_title.render("GAME OVER", True, (200, 50, 50))
+    title = rtext(font_title, "GAME OVER", (200, 50, 50))
     screen.blit(title, (WIDTH // 2 - title.get_width() // 2, int(200 + bob)))
 
     if (frame // 30) % 2 == 0:
-        prompt = font_large.render("Press ENTER", True, (200, 200, 200))
+        prompt = rtext(font_large, "Press ENTER", (200, 200, 200))
         screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, 350))
 
 
@@ -1741,12 +2025,7 @@ def main():
 
     # Level data
     current_level = LEVEL_CASTLE_GROUNDS
-    map_objects = []
-    coins_list = []
-    stars_list = []
-    paintings_list = []
-    floor_color = COL_GRASS
-    sky_color = BG_COLOR
+    level = LevelData()
 
     # Camera
     cam_angle = 0
@@ -1755,6 +2034,7 @@ def main():
     # Menu state
     file_selected = 0
     pause_selected = 0
+    pause_snapshot = None  # Frozen game frame shown behind the pause menu
 
     # Star get state
     star_get_name = ""
@@ -1768,17 +2048,14 @@ def main():
     # Key cooldown for menus
     key_cooldown = 0
 
+    # Closest painting to the player, refreshed once per update
+    near_painting, near_painting_d2 = None, float('inf')
+
     def load_level(level_id):
-        nonlocal map_objects, coins_list, stars_list, paintings_list, floor_color, sky_color
-        nonlocal cam_angle, cam_x, cam_y, cam_z
-        blocks, coins, stars, paintings, fc, sc, start = build_level(level_id)
-        map_objects = blocks
-        coins_list = coins
-        stars_list = stars
-        paintings_list = paintings
-        floor_color = fc
-        sky_color = sc
-        player.reset_position(*start)
+        nonlocal level, cam_angle, cam_x, cam_y, cam_z, near_painting, near_painting_d2
+        level = build_level(level_id)
+        near_painting, near_painting_d2 = None, float('inf')
+        player.reset_position(*level.start_pos)
         player.health = player.max_health
         player.coins = 0
         cam_angle = 0
@@ -1786,16 +2063,25 @@ def main():
         cam_y = player.y - CAM_HEIGHT
         cam_z = player.z - CAM_DISTANCE
 
+    sin, cos = math.sin, math.cos
+    fps_text = None
+    camera_pos = Vector3()  # Reused every frame
+
     running = True
     while running:
         dt = clock.tick(FPS) / 1000.0
         frame += 1
         game_time = frame / FPS
+        text_cache_tick()
         if key_cooldown > 0:
             key_cooldown -= 1
 
         # --- Events ---
-        for event in pygame.event.get():
+        # Only quit and key presses drive the game; mouse motion is read via
+        # get_rel(), so everything else is dropped without building Event objects.
+        events = pygame.event.get(eventtype=(pygame.QUIT, pygame.KEYDOWN))
+        pygame.event.clear(pump=False)
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
@@ -1838,29 +2124,26 @@ def main():
                         if state == STATE_LEVEL:
                             state = STATE_PAUSE
                             pause_selected = 0
+                            pause_snapshot = None
                             key_cooldown = 15
                             pygame.mouse.set_visible(True)
                             pygame.event.set_grab(False)
                         elif state == STATE_CASTLE:
                             state = STATE_PAUSE
                             pause_selected = 0
+                            pause_snapshot = None
                             key_cooldown = 15
                             pygame.mouse.set_visible(True)
                             pygame.event.set_grab(False)
 
                     if event.key in (pygame.K_RETURN, pygame.K_k):
                         # Check painting proximity in castle (jump into painting)
-                        if state == STATE_CASTLE:
-                            for p in paintings_list:
-                                dx = player.x - p.x
-                                dz = player.z - p.z
-                                dist = math.sqrt(dx*dx + dz*dz)
-                                if dist < p.trigger_radius:
-                                    current_level = p.level_id
-                                    state = STATE_LEVEL
-                                    load_level(current_level)
-                                    key_cooldown = 20
-                                    break
+                        if state == STATE_CASTLE and near_painting is not None and \
+                           near_painting_d2 < near_painting.trigger_radius ** 2:
+                            current_level = near_painting.level_id
+                            state = STATE_LEVEL
+                            load_level(current_level)
+                            key_cooldown = 20
 
                 elif state == STATE_PAUSE:
                     if event.key == pygame.K_ESCAPE and key_cooldown == 0:
@@ -1916,7 +2199,7 @@ def main():
                         pygame.mouse.set_visible(True)
                         pygame.event.set_grab(False)
 
-        keys = pygame.key.get_pressed()
+        buttons = read_buttons(pygame.key.get_pressed())
 
         # --- Update ---
         if state in (STATE_CASTLE, STATE_LEVEL):
@@ -1928,52 +2211,39 @@ def main():
             else:
                 pygame.mouse.get_rel()  # Flush delta when not captured
             # C-buttons (Arrow Keys) for camera nudge
-            if keys[pygame.K_LEFT]: cam_angle -= CAM_C_SPEED
-            if keys[pygame.K_RIGHT]: cam_angle += CAM_C_SPEED
-            # Q/E also work as alternative camera controls
-            if keys[pygame.K_q]: cam_angle -= CAM_C_SPEED
-            if keys[pygame.K_e]: cam_angle += CAM_C_SPEED
+            # (Q/E also work as alternative camera controls)
+            if buttons & BTN_C_LEFT: cam_angle -= CAM_C_SPEED
+            if buttons & BTN_C_RIGHT: cam_angle += CAM_C_SPEED
 
-            player.update(keys, map_objects, cam_angle)
+            player.update(buttons, level.blocks, cam_angle)
+            near_painting, near_painting_d2 = nearest_painting(level.paintings, player.x, player.z)
 
             # Lakitu camera
-            target_cx = player.x - math.sin(cam_angle) * CAM_DISTANCE
-            target_cz = player.z - math.cos(cam_angle) * CAM_DISTANCE
-            target_cy = player.y - CAM_HEIGHT
-            cam_x = lerp(cam_x, target_cx, CAM_SMOOTHING)
-            cam_y = lerp(cam_y, target_cy, CAM_SMOOTHING)
-            cam_z = lerp(cam_z, target_cz, CAM_SMOOTHING)
-
-            camera_pos = Vector3(cam_x, cam_y, cam_z)
+            # (lerp toward the target, inlined for the three axes)
+            cam_x += (player.x - sin(cam_angle) * CAM_DISTANCE - cam_x) * CAM_SMOOTHING
+            cam_y += (player.y - CAM_HEIGHT - cam_y) * CAM_SMOOTHING
+            cam_z += (player.z - cos(cam_angle) * CAM_DISTANCE - cam_z) * CAM_SMOOTHING
 
             # Coin collection
-            for coin in coins_list:
-                if not coin.collected:
-                    dx = player.x - coin.x
-                    dy = player.y - coin.y
-                    dz = player.z - coin.z
-                    dist = math.sqrt(dx*dx + dy*dy + dz*dz)
-                    if dist < 50:
-                        player.collect_coin(coin)
+            px, py, pz = player.x, player.y, player.z
+            for i in hits_within(level.coin_xyz, level.coin_alive, px, py, pz, 50):
+                level.coin_alive[i] = 0
+                player.collect_coin(level.coins[i])
 
             # Star collection
-            for star in stars_list:
-                if not star.collected:
-                    dx = player.x - star.x
-                    dy = player.y - star.y
-                    dz = player.z - star.z
-                    dist = math.sqrt(dx*dx + dy*dy + dz*dz)
-                    if dist < 60:
-                        if player.collect_star(star, current_level):
-                            sid = star.star_id
-                            names = STAR_NAMES.get(current_level, [])
-                            star_get_name = names[sid] if sid < len(names) else f"Star #{sid+1}"
-                            star_get_timer = 0
-                            star_get_level = current_level
-                            state = STATE_STAR_GET
-                            key_cooldown = 30
-                            pygame.mouse.set_visible(True)
-                            pygame.event.set_grab(False)
+            for i in hits_within(level.star_xyz, level.star_alive, px, py, pz, 60):
+                level.star_alive[i] = 0
+                star = level.stars[i]
+                if player.collect_star(star, current_level):
+                    sid = star.star_id
+                    names = STAR_NAMES.get(current_level, [])
+                    star_get_name = names[sid] if sid < len(names) else f"Star #{sid+1}"
+                    star_get_timer = 0
+                    star_get_level = current_level
+                    state = STATE_STAR_GET
+                    key_cooldown = 30
+                    pygame.mouse.set_visible(True)
+                    pygame.event.set_grab(False)
 
             # Death check
             if player.health <= 0 or player.y > 800:
@@ -2003,38 +2273,34 @@ def main():
             draw_letter_screen(screen, font_large, font_small, frame)
 
         elif state in (STATE_CASTLE, STATE_LEVEL):
-            screen.fill(sky_color)
-            camera_pos = Vector3(cam_x, cam_y, cam_z)
-            render_scene(screen, player, map_objects, coins_list, stars_list,
-                        paintings_list, floor_color, camera_pos, cam_angle, game_time)
+            screen.fill(level.sky_color)
+            camera_pos.x, camera_pos.y, camera_pos.z = cam_x, cam_y, cam_z
+            render_scene(screen, player, level, camera_pos, cam_angle, game_time)
             draw_hud(screen, player, current_level, font_large, font_small,
                     show_star_name, star_name_timer)
 
             # Show painting labels when near
-            if state == STATE_CASTLE:
-                for p in paintings_list:
-                    dx = player.x - p.x
-                    dz = player.z - p.z
-                    dist = math.sqrt(dx*dx + dz*dz)
-                    if dist < p.trigger_radius * 1.5:
-                        name = LEVEL_NAMES.get(p.level_id, "???")
-                        star_count = len(player.stars_collected.get(p.level_id, set()))
-                        label = f"{name} (★{star_count}/7) - Press K or ENTER"
-                        surf = font_small.render(label, True, COL_GOLD)
-                        bg = pygame.Surface((surf.get_width() + 10, surf.get_height() + 6), pygame.SRCALPHA)
-                        bg.fill((0, 0, 0, 150))
-                        screen.blit(bg, (WIDTH//2 - surf.get_width()//2 - 5, HEIGHT - 80))
-                        screen.blit(surf, (WIDTH//2 - surf.get_width()//2, HEIGHT - 77))
-                        break
+            p = near_painting
+            if state == STATE_CASTLE and p is not None and near_painting_d2 < (p.trigger_radius * 1.5) ** 2:
+                name = LEVEL_NAMES.get(p.level_id, "???")
+                star_count = len(player.stars_collected.get(p.level_id, set()))
+                label = f"{name} (★{star_count}/7) - Press K or ENTER"
+                surf = rtext(font_small, label, COL_GOLD)
+                bg = get_label_bg(surf.get_width() + 10, surf.get_height() + 6)
+                screen.blit(bg, (WIDTH//2 - surf.get_width()//2 - 5, HEIGHT - 80))
+                screen.blit(surf, (WIDTH//2 - surf.get_width()//2, HEIGHT - 77))
 
             draw_controls_help(screen, font_small)
 
         elif state == STATE_PAUSE:
-            # Draw game behind pause
-            screen.fill(sky_color)
-            camera_pos = Vector3(cam_x, cam_y, cam_z)
-            render_scene(screen, player, map_objects, coins_list, stars_list,
-                        paintings_list, floor_color, camera_pos, cam_angle, game_time)
+            # Draw game behind pause; the world is frozen, so render it once
+            if pause_snapshot is None:
+                screen.fill(level.sky_color)
+                camera_pos.x, camera_pos.y, camera_pos.z = cam_x, cam_y, cam_z
+                render_scene(screen, player, level, camera_pos, cam_angle, game_time)
+                pause_snapshot = screen.copy()
+            else:
+                screen.blit(pause_snapshot, (0, 0))
             draw_pause_screen(screen, font_title, font_large, font_small, player, pause_selected)
 
         elif state == STATE_STAR_GET:
@@ -2044,8 +2310,9 @@ def main():
         elif state == STATE_GAME_OVER:
             draw_game_over(screen, font_title, font_large, font_small, frame)
 
-        # FPS counter
-        fps_text = font_small.render(f"FPS: {int(clock.get_fps())}", True, (200, 200, 200))
+        # FPS counter (refreshed every 15 frames; get_fps() is an average anyway)
+        if fps_text is None or frame % 15 == 0:
+            fps_text = rtext(font_small, f"FPS: {int(clock.get_fps())}", (200, 200, 200))
         screen.blit(fps_text, (WIDTH - 80, HEIGHT - 20))
 
         pygame.display.flip()
@@ -10,10 +10,13 @@
  Single-File Build — No external assets required
 ============================================================================
 """
-import pygame, math, sys, random, struct, array, time
+import pygame, math, sys, os, random, struct, array, time, wave, hashlib, copy
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import cycle
+from operator import itemgetter
 from enum import Enum, auto
-from typing import List, Tuple, Optional, Dict, Set
+from typing import List, Tuple, Optional, Dict
 
 # ============================================================================
 #  ENGINE CONFIG
@@ -25,13 +28,16 @@ FRAME_SKIP = FPS // LOGIC_HZ
 FOV = 500
 NEAR_CLIP = 10
 FAR_CLIP = 12000
+# Unit normals of the side and top/bottom frustum planes, as (view-z, lateral) components
+_FRUSTUM_HZ, _FRUSTUM_HX = WIDTH / 2 / math.hypot(FOV, WIDTH / 2), FOV / math.hypot(FOV, WIDTH / 2)
+_FRUSTUM_VZ, _FRUSTUM_VY = HEIGHT / 2 / math.hypot(FOV, HEIGHT / 2), FOV / math.hypot(FOV, HEIGHT / 2)
 
 S16_MAX = 32767
 
 # ============================================================================
 #  MATH TYPES
 # ============================================================================
-@dataclass
+@dataclass(slots=True)
 class Vec3f:
     x: float = 0.0; y: float = 0.0; z: float = 0.0
     def set(self, x, y, z): self.x, self.y, self.z = x, y, z
@@ -52,7 +58,9 @@ class Vec3f:
 class Vec3s:
     x: int = 0; y: int = 0; z: int = 0
 
-def clamp(v, lo, hi): return max(lo, min(hi, v))
+# Shared read-only zero; only for fields that are replaced, never mutated in place
+_ZERO = Vec3f()
+
 def lerp(a, b, t): return a + (b - a) * t
 def approach_f32(cur, tgt, inc):
     if cur < tgt: return min(cur+inc, tgt)
@@ -66,8 +74,14 @@ def approach_angle(cur, tgt, inc):
 def sins(d): return math.sin(math.radians(d))
 def coss(d): return math.cos(math.radians(d))
 def atan2d(y, x): return math.degrees(math.atan2(y, x))
+@lru_cache(maxsize=2048)
 def _cc(c): return tuple(max(0, min(255, int(v))) for v in c)
 
+# 256-step sine table for cosmetic bobbing; truncation error stays under 0.025
+BOB_LUT = array.array('d', [math.sin(i * 2 * math.pi / 256) for i in range(256)])
+_BOB_SCALE = 256 / (2 * math.pi)
+def bob_sin(phase): return BOB_LUT[int(phase * _BOB_SCALE) & 255]
+
 class GameState(Enum):
     TITLE=auto(); FILE_SELECT=auto(); LEVEL_SELECT=auto(); GAMEPLAY=auto()
     PAUSE=auto(); DEATH=auto(); STAR_GRAB=auto()
@@ -100,6 +114,7 @@ ACT_KNOCKBACK     = 0x02020C00
 ACT_LAVA_BOOST    = 0x00020C02
 ACT_STAR_DANCE    = 0x00001302
 ACT_DEATH         = 0x00020C04
+ACT_ID_MASK       = 0x000001FF
 
 # Short-form for map keys
 _A = {
@@ -116,6 +131,14 @@ _A = {
     'star': ACT_STAR_DANCE, 'death': ACT_DEATH
 }
 
+# Action groups for membership tests in interaction and the Mario model
+ACTS_ATTACK = frozenset((ACT_PUNCHING, ACT_PUNCH2, ACT_KICK, ACT_SLIDE_KICK, ACT_SLIDE_KICK_SL))
+ACTS_STOMP = frozenset((ACT_DIVE, ACT_GP_LAND))
+ACTS_POUND = frozenset((ACT_GROUND_POUND, ACT_GP_LAND))
+ACTS_CROUCH = frozenset((ACT_CROUCH_IDLE, ACT_BELLY_SLIDE, ACT_SLIDE_KICK_SL))
+ACTS_DIVE = frozenset((ACT_DIVE, ACT_SLIDE_KICK))
+ACTS_PUNCH = frozenset((ACT_PUNCHING, ACT_PUNCH2, ACT_KICK))
+
 # Physics constants from the SM64 decomp
 GRAVITY = -4.0
 MAX_FALL = -75.0
@@ -136,6 +159,7 @@ KNOCKBACK_VEL = 30.0
 
 IN_A = 0x01; IN_B = 0x02; IN_Z = 0x04
 IN_A_D = 0x10; IN_B_D = 0x20; IN_Z_D = 0x40
+IN_ZB = IN_Z | IN_B  # either air-attack button
 
 @dataclass
 class Controller:
@@ -148,7 +172,7 @@ class Controller:
 SURF_DEFAULT = 0; SURF_LAVA = 1; SURF_SLIP = 2; SURF_DEATH = 3
 SURF_WATER = 4; SURF_ICE = 5; SURF_SAND = 6
 
-@dataclass
+@dataclass(slots=True)
 class Surface:
     verts: List[Vec3f]; normal: Vec3f; stype: int = 0
     color: Tuple[int,int,int] = (200,200,200); warp: int = -1
@@ -167,41 +191,54 @@ class ObjType(Enum):
 class Obj:
     type: ObjType; pos: Vec3f; vel: Vec3f = field(default_factory=Vec3f)
     angle: float = 0; radius: float = 50; height: float = 50; hp: int = 1
-    active: bool = True; timer: int = 0; state: int = 0; home: Vec3f = field(default_factory=Vec3f)
+    active: bool = True; timer: int = 0; state: int = 0; home: Vec3f = field(default_factory=lambda: _ZERO)
     color: Tuple[int,int,int] = (255,255,0); collected: bool = False
     irange: float = 80; scale: float = 1.0; dmg: int = 1; coins: int = 0; star_id: int = 0
     warp: int = -1; spd: float = 1.5; pdir: int = 1; bob: float = 0; flash: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Particle:
-    pos: Vec3f; vel: Vec3f; color: Tuple[int,int,int]; life: int; size: float = 3.0
+    x: float; y: float; z: float; vx: float; vy: float; vz: float
+    color: Tuple[int,int,int]; life: int; size: float = 3.0
     kind: int = 0  # 0=normal, 1=sparkle, 2=smoke
 
+SPARKLE_PALETTE = ((255,255,100),(255,200,50),(255,255,200),(255,255,255))
+_GREYS = tuple((g, g, g) for g in range(256))  # shared smoke colours, one tuple per shade
+
 class Particles:
-    def __init__(self): self.ps: List[Particle] = []
+    def __init__(self):
+        self.ps: List[Particle] = []
+        self._free: List[Particle] = []  # expired particles, reinitialised by _new before allocating
+    def _new(self, x, y, z, vx, vy, vz, c, l, sz, kind):
+        if not self._free: return Particle(x, y, z, vx, vy, vz, c, l, sz, kind)
+        q = self._free.pop()
+        q.x = x; q.y = y; q.z = z; q.vx = vx; q.vy = vy; q.vz = vz
+        q.color = c; q.life = l; q.size = sz; q.kind = kind
+        return q
     def emit(self, p, n, c, s=5.0, l=20, sz=3.0, kind=0):
-        for _ in range(n):
-            v = Vec3f(random.uniform(-s,s), random.uniform(0,s*1.5), random.uniform(-s,s))
-            self.ps.append(Particle(p.copy(), v, c, l, sz, kind))
+        u = random.uniform; x, y, z = p.x, p.y, p.z; new = self._new
+        self.ps += [new(x, y, z, u(-s,s), u(0,s*1.5), u(-s,s), c, l, sz, kind) for _ in range(n)]
     def emit_sparkle(self, p, n=5):
-        for _ in range(n):
-            v = Vec3f(random.uniform(-3,3), random.uniform(2,8), random.uniform(-3,3))
-            c = random.choice([(255,255,100),(255,200,50),(255,255,200),(255,255,255)])
-            self.ps.append(Particle(p.copy(), v, c, random.randint(15,30), random.uniform(2,5), 1))
+        u = random.uniform; x, y, z = p.x, p.y, p.z; new = self._new
+        self.ps += [new(x, y, z, u(-3,3), u(2,8), u(-3,3), random.choice(SPARKLE_PALETTE), random.randint(15,30), u(2,5), 1)
+                    for _ in range(n)]
     def emit_smoke(self, p, n=3):
+        u = random.uniform; x, y, z = p.x, p.y, p.z
         for _ in range(n):
-            v = Vec3f(random.uniform(-1,1), random.uniform(1,4), random.uniform(-1,1))
+            vx, vy, vz = u(-1,1), u(1,4), u(-1,1)
             g = random.randint(180,240)
-            self.ps.append(Particle(p.copy(), v, (g,g,g), random.randint(10,25), random.uniform(3,8), 2))
+            self.ps.append(self._new(x, y, z, vx, vy, vz, _GREYS[g], random.randint(10,25), u(3,8), 2))
     def update(self):
-        alive = []
+        dead = False
         for p in self.ps:
-            p.pos.x += p.vel.x; p.pos.y += p.vel.y; p.pos.z += p.vel.z
-            p.vel.y -= 0.3 if p.kind != 2 else -0.1
+            p.x += p.vx; p.y += p.vy; p.z += p.vz
             p.life -= 1
-            if p.kind == 2: p.size *= 1.03; p.vel.x *= 0.95; p.vel.z *= 0.95
-            if p.life > 0: alive.append(p)
-        self.ps = alive
+            if p.kind == 2: p.vy += 0.1; p.size *= 1.03; p.vx *= 0.95; p.vz *= 0.95
+            else: p.vy -= 0.3
+            if p.life <= 0: dead = True
+        if dead:
+            self._free += [p for p in self.ps if p.life <= 0]
+            self.ps = [p for p in self.ps if p.life > 0]
 
 # ============================================================================
 #  MARIO STATE — Matches decomp struct layout
@@ -215,7 +252,7 @@ class MarioState:
     floor: Optional[Surface] = None; floor_y: float = -10000
     wall: Optional[Surface] = None; imag: float = 0; iyaw: int = 0
     peak_y: float = 0; jcount: int = 0; jtimer: int = 0; wktimer: int = 0
-    hurt: int = 0; inv: int = 0; lvl_stars: Dict[int,Set[int]] = field(default_factory=dict)
+    hurt: int = 0; inv: int = 0; stars_bits: int = 0  # bit l*8+s set once star s of level l is collected
     punch_state: int = 0; punch_timer: int = 0
     squish: float = 1.0; squish_vel: float = 0.0
     anim_frame: int = 0; bob_phase: float = 0.0
@@ -228,130 +265,152 @@ class MarioState:
         if self.inv > 0: return
         self.health = max(0, self.health - amt); self.hurt = 10; self.inv = 60
     def wedges(self): return (self.health >> 8) & 0xF
-    def has_star(self, l, s): return s in self.lvl_stars.get(l, set())
+    def has_star(self, l, s): return bool(self.stars_bits & (1 << (l*8+s)))
     def get_star(self, l, s):
-        if l not in self.lvl_stars: self.lvl_stars[l] = set()
-        if s not in self.lvl_stars[l]: self.lvl_stars[l].add(s); self.stars += 1
+        bit = 1 << (l*8+s)
+        if not self.stars_bits & bit: self.stars_bits |= bit; self.stars += 1
+    def lvl_star_count(self, l): return ((self.stars_bits >> (l*8)) & 0xFF).bit_count()
 
 # ============================================================================
 #  AUDIO ENGINE — Procedural SFX
 # ============================================================================
 AUDIO_RATE = 22050
 
+def _times(n):
+    return [i / AUDIO_RATE for i in range(n)]
+
+# White noise drawn once; noisy SFX read a random window instead of calling the PRNG per sample
+_noise_rng = random.Random(42)
+NOISE_POOL = array.array('d', [_noise_rng.uniform(-1, 1) for _ in range(8192)])
+del _noise_rng
+
+def _noise(n):
+    if n >= len(NOISE_POOL): return NOISE_POOL * (n // len(NOISE_POOL) + 1)
+    start = random.randrange(len(NOISE_POOL) - n)
+    return NOISE_POOL[start:start + n]
+
+def _sound(samples):
+    return pygame.mixer.Sound(buffer=array.array('h', samples))
+
+def _tone_square(freq, dur, vol):
+    return [int((1.0 if (t * freq) % 1.0 < 0.5 else -1.0) * vol * max(0, 1.0 - t / dur) * 32767) for t in _times(int(AUDIO_RATE * dur))]
+
+def _tone_noise(freq, dur, vol):
+    ts = _times(int(AUDIO_RATE * dur))
+    return [int(r * vol * max(0, 1.0 - t / dur) * 32767) for r, t in zip(_noise(len(ts)), ts)]
+
+def _tone_tri(freq, dur, vol):
+    return [int((4 * abs((t * freq) % 1.0 - 0.5) - 1) * vol * max(0, 1.0 - t / dur) * 32767) for t in _times(int(AUDIO_RATE * dur))]
+
+def _tone_sine(freq, dur, vol):
+    sin = math.sin; w = 2 * math.pi * freq
+    return [int(sin(w * t) * vol * max(0, 1.0 - t / dur) * 32767) for t in _times(int(AUDIO_RATE * dur))]
+
+_TONE_WAVES = {'square': _tone_square, 'noise': _tone_noise, 'tri': _tone_tri, 'sine': _tone_sine}
+
 def _gen_tone(freq, dur, vol=0.3, wave='square'):
-    n = int(AUDIO_RATE * dur)
-    buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE
-        env = max(0, 1.0 - t / dur)
-        if wave == 'square':
-            v = 1.0 if (t * freq) % 1.0 < 0.5 else -1.0
-        elif wave == 'noise':
-            v = random.uniform(-1, 1)
-        elif wave == 'tri':
-            p = (t * freq) % 1.0
-            v = 4 * abs(p - 0.5) - 1
-        elif wave == 'sine':
-            v = math.sin(2 * math.pi * freq * t)
-        else:
-            v = 0
-        buf.append(int(v * vol * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    gen = _TONE_WAVES.get(wave)
+    return _sound(gen(freq, dur, vol) if gen else [0] * int(AUDIO_RATE * dur))
 
 def _gen_jump():
-    n = int(AUDIO_RATE * 0.15); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE; f = 300 + t * 3000
-        env = max(0, 1 - t / 0.15)
-        v = 1.0 if (t * f) % 1.0 < 0.5 else -1.0
-        buf.append(int(v * 0.2 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.15))
+    return _sound([int((1.0 if (t * (300 + t * 3000)) % 1.0 < 0.5 else -1.0) * 0.2 * max(0, 1 - t / 0.15) * 32767) for t in ts])
 
 def _gen_coin():
-    n = int(AUDIO_RATE * 0.12); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE
-        f = 1500 if t < 0.04 else 2000
-        env = max(0, 1 - t / 0.12)
-        v = math.sin(2 * math.pi * f * t)
-        buf.append(int(v * 0.25 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.12)); sin = math.sin
+    w1, w2 = 2 * math.pi * 1500, 2 * math.pi * 2000
+    return _sound([int(sin((w1 if t < 0.04 else w2) * t) * 0.25 * max(0, 1 - t / 0.12) * 32767) for t in ts])
 
 def _gen_stomp():
-    n = int(AUDIO_RATE * 0.1); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE; f = 200 - t * 800
-        env = max(0, 1 - t / 0.1)
-        v = random.uniform(-1, 1) * 0.5 + (1.0 if (t * max(20, f)) % 1.0 < 0.5 else -1.0) * 0.5
-        buf.append(int(v * 0.2 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.1))
+    return _sound([int((r * 0.5 + (1.0 if (t * max(20, 200 - t * 800)) % 1.0 < 0.5 else -1.0) * 0.5)
+                       * 0.2 * max(0, 1 - t / 0.1) * 32767) for r, t in zip(_noise(len(ts)), ts)])
 
 def _gen_star():
-    n = int(AUDIO_RATE * 0.6); buf = array.array('h')
+    n = int(AUDIO_RATE * 0.6); ts = _times(n); sin = math.sin
     notes = [523, 659, 784, 1047, 784, 1047]
-    note_len = n // len(notes)
-    for i in range(n):
-        ni = min(i // note_len, len(notes) - 1)
-        t = i / AUDIO_RATE; f = notes[ni]
-        env = max(0, 1 - (i % note_len) / note_len * 0.5) * max(0, 1 - t / 0.6 * 0.3)
-        v = math.sin(2 * math.pi * f * t) * 0.4 + math.sin(2 * math.pi * f * 2 * t) * 0.15
-        buf.append(int(v * 0.25 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    note_len = n // len(notes); out = []
+    # Each note restarts at phase 0 on its own clock; the attack envelope is shared
+    lt = ts[:note_len]; env = [max(0, 1 - j / note_len * 0.5) for j in range(note_len)]
+    for k, f in enumerate(notes):
+        i0 = k * note_len; i1 = n if k == len(notes) - 1 else i0 + note_len
+        w1 = 2 * math.pi * f; w2 = w1 * 2
+        out += [int((sin(w1 * tl) * 0.4 + sin(w2 * tl) * 0.15) * 0.25 * (e * max(0, 1 - t / 0.6 * 0.3)) * 32767)
+                for t, tl, e in zip(ts[i0:i1], cycle(lt), cycle(env))]
+    return _sound(out)
 
 def _gen_hurt():
-    n = int(AUDIO_RATE * 0.2); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE; f = 400 - t * 1200
-        env = max(0, 1 - t / 0.2)
-        v = random.uniform(-1, 1) * 0.6 + math.sin(2 * math.pi * max(50, f) * t) * 0.4
-        buf.append(int(v * 0.2 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.2)); sin = math.sin; tau = 2 * math.pi
+    return _sound([int((r * 0.6 + sin(tau * max(50, 400 - t * 1200) * t) * 0.4)
+                       * 0.2 * max(0, 1 - t / 0.2) * 32767) for r, t in zip(_noise(len(ts)), ts)])
 
 def _gen_punch():
-    n = int(AUDIO_RATE * 0.08); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE
-        env = max(0, 1 - t / 0.08)
-        v = random.uniform(-1, 1) * 0.7 + math.sin(2 * math.pi * 150 * t) * 0.3
-        buf.append(int(v * 0.18 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.08)); sin = math.sin; w = 2 * math.pi * 150
+    return _sound([int((r * 0.7 + sin(w * t) * 0.3) * 0.18 * max(0, 1 - t / 0.08) * 32767)
+                   for r, t in zip(_noise(len(ts)), ts)])
 
 def _gen_1up():
-    n = int(AUDIO_RATE * 0.35); buf = array.array('h')
+    n = int(AUDIO_RATE * 0.35); ts = _times(n); sin = math.sin
     notes = [523, 659, 784, 1047, 1319]
-    note_len = n // len(notes)
-    for i in range(n):
-        ni = min(i // note_len, len(notes) - 1)
-        t = i / AUDIO_RATE; f = notes[ni]
-        env = max(0, 1 - (i % note_len) / note_len * 0.3) * max(0, 1 - t / 0.35 * 0.2)
-        v = math.sin(2 * math.pi * f * t)
-        buf.append(int(v * 0.2 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    note_len = n // len(notes); out = []
+    lt = ts[:note_len]; env = [max(0, 1 - j / note_len * 0.3) for j in range(note_len)]
+    for k, f in enumerate(notes):
+        i0 = k * note_len; i1 = n if k == len(notes) - 1 else i0 + note_len
+        w = 2 * math.pi * f
+        out += [int(sin(w * tl) * 0.2 * (e * max(0, 1 - t / 0.35 * 0.2)) * 32767)
+                for t, tl, e in zip(ts[i0:i1], cycle(lt), cycle(env))]
+    return _sound(out)
 
 def _gen_wahoo():
-    n = int(AUDIO_RATE * 0.25); buf = array.array('h')
-    for i in range(n):
-        t = i / AUDIO_RATE
-        f = 250 + math.sin(t * 15) * 100 + t * 400
-        env = max(0, 1 - t / 0.25)
-        v = math.sin(2 * math.pi * f * t) * 0.5 + math.sin(2 * math.pi * f * 1.5 * t) * 0.3
-        buf.append(int(v * 0.15 * env * 32767))
-    return pygame.mixer.Sound(buffer=buf)
+    ts = _times(int(AUDIO_RATE * 0.25)); sin = math.sin; tau = 2 * math.pi
+    out = []
+    for t in ts:
+        f = 250 + sin(t * 15) * 100 + t * 400
+        out.append(int((sin(tau * f * t) * 0.5 + sin(tau * f * 1.5 * t) * 0.3) * 0.15 * max(0, 1 - t / 0.25) * 32767))
+    return _sound(out)
+
+# Generated SFX are cached as WAVs; bump SFX_CACHE_VERSION when a _gen_* changes
+SFX_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sm64py')
+SFX_CACHE_VERSION = 3
+_SFX_GENS = (('jump', _gen_jump), ('coin', _gen_coin), ('stomp', _gen_stomp), ('star', _gen_star),
+             ('hurt', _gen_hurt), ('punch', _gen_punch), ('1up', _gen_1up), ('wahoo', _gen_wahoo))
 
 sfx = {}
+SFX_COIN = None  # hottest sound, bound directly so play_coin skips the dict
+CH_COIN = None   # reserved channel: coin bursts retrigger here instead of stealing other SFX voices
+
+def _load_sfx(name, gen):
+    freq, fmt, chans = pygame.mixer.get_init()
+    key = hashlib.md5(repr((AUDIO_RATE, name, SFX_CACHE_VERSION, freq, fmt, chans)).encode()).hexdigest()[:12]
+    path = os.path.join(SFX_CACHE_DIR, f"sfx_{key}.wav")
+    if os.path.exists(path):
+        try: return pygame.mixer.Sound(path)
+        except pygame.error: pass
+    snd = gen()
+    try:
+        os.makedirs(SFX_CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with wave.open(tmp, 'wb') as w:
+            w.setnchannels(chans); w.setsampwidth(abs(fmt) // 8); w.setframerate(freq)
+            w.writeframes(snd.get_raw())
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return snd
+
+def _set_sfx(name, snd):
+    global SFX_COIN
+    sfx[name] = snd
+    if name == 'coin': SFX_COIN = snd
 
 def init_audio():
-    global sfx
+    global sfx, CH_COIN
     try:
         pygame.mixer.init(AUDIO_RATE, -16, 1, 512)
-        sfx['jump'] = _gen_jump()
-        sfx['coin'] = _gen_coin()
-        sfx['stomp'] = _gen_stomp()
-        sfx['star'] = _gen_star()
-        sfx['hurt'] = _gen_hurt()
-        sfx['punch'] = _gen_punch()
-        sfx['1up'] = _gen_1up()
-        sfx['wahoo'] = _gen_wahoo()
+        pygame.mixer.set_num_channels(16); pygame.mixer.set_reserved(1)
+        CH_COIN = pygame.mixer.Channel(0)
+        for name, gen in _SFX_GENS:
+            _set_sfx(name, _load_sfx(name, gen))
     except:
         pass
 
@@ -360,10 +419,19 @@ def play_sfx(name):
         try: sfx[name].play()
         except: pass
 
+def play_coin():
+    if SFX_COIN is not None:
+        try: CH_COIN.play(SFX_COIN)
+        except: pass
+
 # ============================================================================
 #  GLOBALS
 # ============================================================================
 surfs: List[Surface] = []
+# Flat per-surface collision records built by finalize_level() and bucketed into
+# 256-unit XZ cells for floors and 256-unit Y bands for walls (walls are infinite planes in XZ)
+_FLOOR_GRID: Dict[Tuple[int, int], tuple] = {}; _WALL_BANDS: Dict[int, tuple] = {}
+_SURF_BOUNDS: List[tuple] = []  # (cx, cy, cz, radius) per surface, parallel to surfs
 objs: List[Obj] = []
 cur_lvl = 0; cur_name = ""
 ptcl = Particles()
@@ -372,18 +440,33 @@ ctrl = Controller()
 # ============================================================================
 #  GEOMETRY BUILDERS
 # ============================================================================
+# Axis-aligned face normals are never mutated, so every box shares them
+N_UP = Vec3f(0,1,0); N_PX = Vec3f(1,0,0); N_NX = Vec3f(-1,0,0)
+N_PZ = Vec3f(0,0,1); N_NZ = Vec3f(0,0,-1)
+
+def _box_tints(col):
+    return (_cc((col[0]*1.12, col[1]*1.12, col[2]*1.12)), _cc((col[0]*0.88, col[1]*0.88, col[2]*0.88)),
+            _cc((col[0]*0.82, col[1]*0.82, col[2]*0.82)), _cc((col[0]*0.78, col[1]*0.78, col[2]*0.78)))
+
+def _box_surfs(x, y, z, w, h, d, tints, st, wp):
+    hw, hh, hd = w/2, h/2, d/2; tc, fc, bc, dc = tints
+    x0, x1, y0, y1, z0, z1 = x-hw, x+hw, y-hh, y+hh, z-hd, z+hd
+    # Faces share the 8 corners; vertices are only read after construction
+    a, b, c, e = Vec3f(x0,y1,z0), Vec3f(x1,y1,z0), Vec3f(x1,y1,z1), Vec3f(x0,y1,z1)
+    f, g, h, k = Vec3f(x0,y0,z1), Vec3f(x1,y0,z1), Vec3f(x1,y0,z0), Vec3f(x0,y0,z0)
+    return [Surface([a, b, c, e], N_UP, st, tc, wp), Surface([f, g, c, e], N_PZ, st, fc, wp),
+            Surface([h, k, a, b], N_NZ, st, bc, wp), Surface([k, f, e, a], N_NX, st, dc, wp),
+            Surface([g, h, b, c], N_PX, st, dc, wp)]
+
 def make_box(x, y, z, w, h, d, col, st=SURF_DEFAULT, wp=-1):
-    hw, hh, hd = w/2, h/2, d/2; s = []
-    tc = _cc((col[0]*1.12, col[1]*1.12, col[2]*1.12))
-    dc = _cc((col[0]*0.78, col[1]*0.78, col[2]*0.78))
-    fc = _cc((col[0]*0.88, col[1]*0.88, col[2]*0.88))
-    bc = _cc((col[0]*0.82, col[1]*0.82, col[2]*0.82))
-    s.append(Surface([Vec3f(x-hw,y+hh,z-hd), Vec3f(x+hw,y+hh,z-hd), Vec3f(x+hw,y+hh,z+hd), Vec3f(x-hw,y+hh,z+hd)], Vec3f(0,1,0), st, tc, wp))
-    s.append(Surface([Vec3f(x-hw,y-hh,z+hd), Vec3f(x+hw,y-hh,z+hd), Vec3f(x+hw,y+hh,z+hd), Vec3f(x-hw,y+hh,z+hd)], Vec3f(0,0,1), st, fc, wp))
-    s.append(Surface([Vec3f(x+hw,y-hh,z-hd), Vec3f(x-hw,y-hh,z-hd), Vec3f(x-hw,y+hh,z-hd), Vec3f(x+hw,y+hh,z-hd)], Vec3f(0,0,-1), st, bc, wp))
-    s.append(Surface([Vec3f(x-hw,y-hh,z-hd), Vec3f(x-hw,y-hh,z+hd), Vec3f(x-hw,y+hh,z+hd), Vec3f(x-hw,y+hh,z-hd)], Vec3f(-1,0,0), st, dc, wp))
-    s.append(Surface([Vec3f(x+hw,y-hh,z+hd), Vec3f(x+hw,y-hh,z-hd), Vec3f(x+hw,y+hh,z-hd), Vec3f(x+hw,y+hh,z+hd)], Vec3f(1,0,0), st, dc, wp))
-    return s
+    return _box_surfs(x, y, z, w, h, d, _box_tints(col), st, wp)
+
+# Render-only boxes built at the origin; callers pass the translation alongside each face
+@lru_cache(maxsize=512)
+def _unit_box(w, h, d, col): return tuple(make_box(0, 0, 0, w, h, d, col))
+
+def _push_box(rl, rt, x, y, z, w, h, d, col):
+    rl.extend([(rt, sf, x, y, z) for sf in _unit_box(w, h, d, col)])
 
 def make_quad(p1, p2, p3, p4, col, st=SURF_DEFAULT):
     ux, uy, uz = p2.x-p1.x, p2.y-p1.y, p2.z-p1.z
@@ -402,19 +485,20 @@ def make_slope(x1, y1, z1, x2, y2, z2, w, col, st=SURF_DEFAULT):
     return make_quad(Vec3f(x1-hw,y1,z1), Vec3f(x1+hw,y1,z1), Vec3f(x2+hw,y2,z2), Vec3f(x2-hw,y2,z2), col, st)
 
 def make_stairs(x, y, z, n, sw, sh, sd, dr, col):
-    r = []
+    r = []; tints = _box_tints(col)
     for i in range(n):
-        r.extend(make_box(x+dr[0]*i*sd, y+i*sh+sh/2, z+dr[1]*i*sd, sw, sh, sd, col))
+        r.extend(_box_surfs(x+dr[0]*i*sd, y+i*sh+sh/2, z+dr[1]*i*sd, sw, sh, sd, tints, SURF_DEFAULT, -1))
     return r
 
 # ============================================================================
 #  SPAWNERS
 # ============================================================================
+_COIN_COLOR = {ObjType.COIN:(255,215,0), ObjType.COIN_RED:(255,50,50), ObjType.COIN_BLUE:(50,100,255)}
+_COIN_VALUE = {ObjType.COIN:1, ObjType.COIN_RED:2, ObjType.COIN_BLUE:5}
+
 def sp_coin(x, y, z, t=ObjType.COIN):
-    cs = {ObjType.COIN:(255,215,0), ObjType.COIN_RED:(255,50,50), ObjType.COIN_BLUE:(50,100,255)}
-    vs = {ObjType.COIN:1, ObjType.COIN_RED:2, ObjType.COIN_BLUE:5}
-    o = Obj(t, Vec3f(x,y+30,z), radius=30, height=30, color=cs.get(t,(255,215,0)), irange=60)
-    o.coins = vs.get(t,1); o.bob = random.uniform(0,6.28); o.home = Vec3f(x,y+30,z); return o
+    o = Obj(t, Vec3f(x,y+30,z), radius=30, height=30, color=_COIN_COLOR.get(t,(255,215,0)), irange=60)
+    o.coins = _COIN_VALUE.get(t,1); o.bob = random.uniform(0,6.28); o.home = Vec3f(x,y+30,z); return o
 
 def sp_star(x, y, z, sid=0):
     o = Obj(ObjType.STAR, Vec3f(x,y+50,z), radius=40, height=40, color=(255,255,100), irange=80, star_id=sid)
@@ -467,8 +551,13 @@ def sp_pipe(x, y, z, tgt):
     o = Obj(ObjType.PIPE, Vec3f(x,y,z), radius=50, height=80, color=(0,180,0), irange=50)
     o.warp = tgt; return o
 
+@lru_cache(maxsize=None)
+def _ring_dirs(n, step):
+    # (sin, cos) of step*i degrees for i < n, shared by rings, spirals and the circular builders
+    return tuple((sins(step*i), coss(step*i)) for i in range(n))
+
 def sp_ring(x, y, z, r=200, n=8):
-    return [sp_coin(x+r*sins(360/n*i), y, z+r*coss(360/n*i)) for i in range(n)]
+    return [sp_coin(x+r*sn, y, z+r*cs) for sn, cs in _ring_dirs(n, 360/n)]
 
 def sp_line(x, y, z, dx, dy, dz, n=5):
     return [sp_coin(x+dx*i, y+dy*i, z+dz*i) for i in range(n)]
@@ -485,38 +574,40 @@ LVL_TOTWC=22; LVL_COTMC=23; LVL_VCUTM=24; LVL_WMOTR=25; LVL_COURT=26
 @dataclass
 class LvlInfo:
     name: str; sky: Tuple[int,int,int] = (135,206,235); nstars: int = 7
-    start: Vec3f = field(default_factory=lambda: Vec3f(0,200,0))
+    start: Tuple[float,float,float] = (0,200,0)  # copied into a fresh Vec3f on spawn
     music_tempo: float = 1.0
 
 LI = {
-    LVL_GROUNDS: LvlInfo("Peach's Castle", (135,206,235), 0, Vec3f(0,200,600)),
-    LVL_INSIDE:  LvlInfo("Castle Interior", (60,60,80), 0, Vec3f(0,50,0)),
-    LVL_BOB:     LvlInfo("Bob-omb Battlefield", (135,206,235), 7, Vec3f(0,200,800)),
-    LVL_WF:      LvlInfo("Whomp's Fortress", (150,200,240), 7, Vec3f(0,200,800)),
-    LVL_JRB:     LvlInfo("Jolly Roger Bay", (80,140,200), 7, Vec3f(0,200,800)),
-    LVL_CCM:     LvlInfo("Cool, Cool Mountain", (200,220,255), 7, Vec3f(0,1200,-1000)),
-    LVL_BBH:     LvlInfo("Big Boo's Haunt", (30,20,50), 7, Vec3f(0,200,800)),
-    LVL_HMC:     LvlInfo("Hazy Maze Cave", (50,40,30), 7, Vec3f(0,200,800)),
-    LVL_LLL:     LvlInfo("Lethal Lava Land", (80,30,10), 7, Vec3f(0,200,0)),
-    LVL_SSL:     LvlInfo("Shifting Sand Land", (230,200,140), 7, Vec3f(0,200,800)),
-    LVL_DDD:     LvlInfo("Dire, Dire Docks", (20,40,100), 7, Vec3f(0,200,800)),
-    LVL_SL:      LvlInfo("Snowman's Land", (180,200,240), 7, Vec3f(0,200,800)),
-    LVL_WDW:     LvlInfo("Wet-Dry World", (170,190,220), 7, Vec3f(0,1000,800)),
-    LVL_TTM:     LvlInfo("Tall, Tall Mountain", (130,190,230), 7, Vec3f(0,2000,0)),
-    LVL_THI:     LvlInfo("Tiny-Huge Island", (135,206,235), 7, Vec3f(0,200,800)),
-    LVL_TTC:     LvlInfo("Tick Tock Clock", (40,30,50), 7, Vec3f(0,200,0)),
-    LVL_RR:      LvlInfo("Rainbow Ride", (100,80,180), 7, Vec3f(0,200,0)),
-    LVL_B1:      LvlInfo("Bowser in the Dark World", (10,10,30), 1, Vec3f(0,200,800)),
-    LVL_B2:      LvlInfo("Bowser in the Fire Sea", (40,10,10), 1, Vec3f(0,200,800)),
-    LVL_B3:      LvlInfo("Bowser in the Sky", (50,40,80), 1, Vec3f(0,200,800)),
-    LVL_SA:      LvlInfo("Secret Aquarium", (20,60,120), 1, Vec3f(0,200,0)),
-    LVL_PSS:     LvlInfo("Princess's Secret Slide", (80,60,120), 2, Vec3f(0,1200,0)),
-    LVL_TOTWC:   LvlInfo("Tower of the Wing Cap", (100,160,255), 1, Vec3f(0,200,0)),
-    LVL_COTMC:   LvlInfo("Cavern of the Metal Cap", (30,60,30), 1, Vec3f(0,200,800)),
-    LVL_VCUTM:   LvlInfo("Vanish Cap Under Moat", (40,40,80), 1, Vec3f(0,200,800)),
-    LVL_WMOTR:   LvlInfo("Wing Mario Over Rainbow", (150,100,220), 1, Vec3f(0,200,0)),
-    LVL_COURT:   LvlInfo("Castle Courtyard", (80,100,80), 0, Vec3f(0,50,400)),
+    LVL_GROUNDS: LvlInfo("Peach's Castle", (135,206,235), 0, (0,200,600)),
+    LVL_INSIDE:  LvlInfo("Castle Interior", (60,60,80), 0, (0,50,0)),
+    LVL_BOB:     LvlInfo("Bob-omb Battlefield", (135,206,235), 7, (0,200,800)),
+    LVL_WF:      LvlInfo("Whomp's Fortress", (150,200,240), 7, (0,200,800)),
+    LVL_JRB:     LvlInfo("Jolly Roger Bay", (80,140,200), 7, (0,200,800)),
+    LVL_CCM:     LvlInfo("Cool, Cool Mountain", (200,220,255), 7, (0,1200,-1000)),
+    LVL_BBH:     LvlInfo("Big Boo's Haunt", (30,20,50), 7, (0,200,800)),
+    LVL_HMC:     LvlInfo("Hazy Maze Cave", (50,40,30), 7, (0,200,800)),
+    LVL_LLL:     LvlInfo("Lethal Lava Land", (80,30,10), 7, (0,200,0)),
+    LVL_SSL:     LvlInfo("Shifting Sand Land", (230,200,140), 7, (0,200,800)),
+    LVL_DDD:     LvlInfo("Dire, Dire Docks", (20,40,100), 7, (0,200,800)),
+    LVL_SL:      LvlInfo("Snowman's Land", (180,200,240), 7, (0,200,800)),
+    LVL_WDW:     LvlInfo("Wet-Dry World", (170,190,220), 7, (0,1000,800)),
+    LVL_TTM:     LvlInfo("Tall, Tall Mountain", (130,190,230), 7, (0,2000,0)),
+    LVL_THI:     LvlInfo("Tiny-Huge Island", (135,206,235), 7, (0,200,800)),
+    LVL_TTC:     LvlInfo("Tick Tock Clock", (40,30,50), 7, (0,200,0)),
+    LVL_RR:      LvlInfo("Rainbow Ride", (100,80,180), 7, (0,200,0)),
+    LVL_B1:      LvlInfo("Bowser in the Dark World", (10,10,30), 1, (0,200,800)),
+    LVL_B2:      LvlInfo("Bowser in the Fire Sea", (40,10,10), 1, (0,200,800)),
+    LVL_B3:      LvlInfo("Bowser in the Sky", (50,40,80), 1, (0,200,800)),
+    LVL_SA:      LvlInfo("Secret Aquarium", (20,60,120), 1, (0,200,0)),
+    LVL_PSS:     LvlInfo("Princess's Secret Slide", (80,60,120), 2, (0,1200,0)),
+    LVL_TOTWC:   LvlInfo("Tower of the Wing Cap", (100,160,255), 1, (0,200,0)),
+    LVL_COTMC:   LvlInfo("Cavern of the Metal Cap", (30,60,30), 1, (0,200,800)),
+    LVL_VCUTM:   LvlInfo("Vanish Cap Under Moat", (40,40,80), 1, (0,200,800)),
+    LVL_WMOTR:   LvlInfo("Wing Mario Over Rainbow", (150,100,220), 1, (0,200,0)),
+    LVL_COURT:   LvlInfo("Castle Courtyard", (80,100,80), 0, (0,50,400)),
 }
+# Level ids are contiguous, so hot lookups index a tuple instead of hashing into LI
+LI_FLAT = tuple(LI.get(i, LI[0]) for i in range(max(LI) + 1))
 
 CATS = [
     ("— Castle —", [LVL_GROUNDS, LVL_INSIDE, LVL_COURT]),
@@ -530,11 +621,54 @@ CATS = [
 # ============================================================================
 #  LEVEL BUILDERS — ALL 27 LEVELS
 # ============================================================================
+# Built levels by id: (surfs, floor grid, wall bands, pristine objs). Geometry is never
+# mutated after finalize_level, so reloads share it and only clone the objects.
+_lvl_cache: Dict[int, tuple] = {}
+
+def _clone_obj(o):
+    c = copy.copy(o); c.pos = o.pos.copy(); c.vel = o.vel.copy(); return c
+
 def load_level(lid):
-    global surfs, objs, cur_lvl, cur_name
-    surfs = []; objs = []; cur_lvl = lid
-    info = LI.get(lid, LI[0]); cur_name = info.name
-    _builders.get(lid, _b_grounds)()
+    global surfs, objs, cur_lvl, cur_name, _FLOOR_GRID, _WALL_BANDS, _SURF_BOUNDS, _ground_memo
+    cur_lvl = lid; _ground_memo = ((), (0.0, None))
+    info = LI_FLAT[lid]; cur_name = info.name
+    hit = _lvl_cache.get(lid)
+    if hit:
+        surfs, _FLOOR_GRID, _WALL_BANDS, _SURF_BOUNDS, tmpl = hit
+        objs = [_clone_obj(o) for o in tmpl]; return
+    surfs = []; objs = []
+    _BUILDERS_FLAT[lid]()
+    finalize_level()
+    _lvl_cache[lid] = (surfs, _FLOOR_GRID, _WALL_BANDS, _SURF_BOUNDS, [_clone_obj(o) for o in objs])
+
+def finalize_level():
+    global _FLOOR_GRID, _WALL_BANDS, _SURF_BOUNDS
+    # Wall bands keep surface order so the first hit matches a full scan. Floor cells are
+    # sorted by each plane's highest point over its bounds so find_floor can stop early;
+    # the surface index rides along to break height ties the way a full scan would.
+    grid = {}; bands = {}; bounds = []
+    for i, s in enumerate(surfs):
+        xs, ys, zs = zip(*[(v.x, v.y, v.z) for v in s.verts])
+        lx, hx, ly, hy, lz, hz = min(xs), max(xs), min(ys), max(ys), min(zs), max(zs)
+        bounds.append(((lx + hx) / 2, (ly + hy) / 2, (lz + hz) / 2, math.sqrt((hx-lx)**2 + (hy-ly)**2 + (hz-lz)**2) / 2 + 1))
+        n = s.normal; nx, ny, nz = n.x, n.y, n.z
+        mnx, mxx, mnz, mxz = min(xs) - 10, max(xs) + 10, min(zs) - 10, max(zs) + 10
+        pd = nx * xs[0] + ny * ys[0] + nz * zs[0]
+        # Near-vertical planes can never be stood on, so only the wall bands hold them
+        if abs(ny) >= 0.01:
+            top = max(-(cx * nx + cz * nz - pd) / ny for cx in (mnx, mxx) for cz in (mnz, mxz)) + 1e-6
+            rec = (top, mnx, mxx, mnz, mxz, nx, ny, nz, pd, i, s)
+            for cx in range(int(mnx) >> 8, (int(mxx) >> 8) + 1):
+                for cz in range(int(mnz) >> 8, (int(mxz) >> 8) + 1):
+                    grid.setdefault((cx, cz), []).append(rec)
+        if abs(ny) > 0.7: continue
+        mny, mxy = min(ys) - 10, max(ys) + 10
+        rec = (mny, mxy, nx, nz, xs[0], zs[0], s)
+        for b in range(int(mny) >> 8, (int(mxy) >> 8) + 1):
+            bands.setdefault(b, []).append(rec)
+    _FLOOR_GRID = {k: tuple(sorted(v, key=lambda r: -r[0])) for k, v in grid.items()}
+    _WALL_BANDS = {k: tuple(v) for k, v in bands.items()}
+    _SURF_BOUNDS = bounds
 
 def _b_grounds():
     surfs.append(make_ground(0, 0, 4000, 4000, 0, (34,180,34)))
@@ -817,8 +951,8 @@ def _b_ttc():
 def _b_rr():
     surfs.extend(make_box(0, 0, 0, 400, 20, 400, (200,180,220)))
     rc = [(255,80,80),(255,165,80),(255,255,80),(80,255,80),(80,80,255),(180,80,255)]
-    for i in range(18):
-        a = i * 30; d = 300 + i * 100; px = d*sins(a); pz = d*coss(a); py = 100 + i * 80
+    for i, (sn, cs) in enumerate(_ring_dirs(18, 30)):
+        d = 300 + i * 100; px = d*sn; pz = d*cs; py = 100 + i * 80
         surfs.extend(make_box(px, py, pz, 150, 20, 150, rc[i%6]))
     surfs.extend(make_box(800, 1200, -800, 400, 100, 200, (120,80,40)))
     surfs.extend(make_box(-600, 1000, -400, 300, 200, 300, (200,180,160)))
@@ -829,8 +963,8 @@ def _b_rr():
     objs.append(sp_star(800, 1360, -800, 0)); objs.append(sp_star(-600, 1120, -400, 1))
     objs.append(sp_star(0, 1600, 0, 2)); objs.append(sp_star(-300, 850, 400, 3))
     objs.extend(sp_ring(0, 40, 0, 150, 8))
-    for i in range(8):
-        a = i * 45; objs.append(sp_coin(300*sins(a), 800+i*30, 300*coss(a), ObjType.COIN_RED))
+    for i, (sn, cs) in enumerate(_ring_dirs(8, 45)):
+        objs.append(sp_coin(300*sn, 800+i*30, 300*cs, ObjType.COIN_RED))
 
 def _b_b1():
     surfs.append(make_ground(0, -200, 0, 4000, 4000, (180,30,0), SURF_LAVA))
@@ -848,8 +982,8 @@ def _b_b1():
 
 def _b_b2():
     surfs.append(make_ground(0, -200, 0, 4000, 4000, (200,50,0), SURF_LAVA))
-    for i in range(15):
-        a = i * 25; d = 200+i*100; px = d*sins(a); pz = d*coss(a); py = i * 60
+    for i, (sn, cs) in enumerate(_ring_dirs(15, 25)):
+        d = 200+i*100; px = d*sn; pz = d*cs; py = i * 60
         surfs.extend(make_box(px, py, pz, 180, 20, 180, (100,60,40)))
     surfs.extend(make_box(0, 500, -500, 250, 20, 250, (110,70,50)))
     surfs.extend(make_box(0, 900, -1200, 600, 20, 600, (90,50,40)))
@@ -877,8 +1011,9 @@ def _b_sa():
     surfs.append(make_ground(0, -400, 0, 1500, 1500, (30,60,130), SURF_WATER))
     surfs.extend(make_box(0, 0, 0, 600, 20, 600, (100,130,160)))
     objs.append(sp_star(0, 50, 0, 0))
-    for _ in range(20):
-        objs.append(sp_coin(random.randint(-500,500), random.randint(-300,-50), random.randint(-500,500)))
+    xs = random.choices(range(-500,501), k=20); ys = random.choices(range(-300,-49), k=20)
+    zs = random.choices(range(-500,501), k=20)
+    objs.extend(sp_coin(x, y, z) for x, y, z in zip(xs, ys, zs))
 
 def _b_pss():
     pts = [(0,1200,0),(200,1000,200),(0,800,400),(-200,600,200),(0,400,0),(200,200,-200),(0,0,-400)]
@@ -892,10 +1027,10 @@ def _b_pss():
 
 def _b_totwc():
     surfs.extend(make_box(0, 0, 0, 200, 20, 200, (200,180,220)))
-    for i in range(8):
-        a = i * 45; surfs.extend(make_box(500*sins(a), -100, 500*coss(a), 150, 20, 150, (180,200,255)))
-    for i in range(8):
-        a = i * 45; objs.append(sp_coin(400*sins(a), 50, 400*coss(a), ObjType.COIN_RED))
+    for sn, cs in _ring_dirs(8, 45):
+        surfs.extend(make_box(500*sn, -100, 500*cs, 150, 20, 150, (180,200,255)))
+    for sn, cs in _ring_dirs(8, 45):
+        objs.append(sp_coin(400*sn, 50, 400*cs, ObjType.COIN_RED))
     objs.append(sp_star(0, 50, 0, 0)); objs.extend(sp_ring(0, 30, 0, 200, 8))
 
 def _b_cotmc():
@@ -918,13 +1053,13 @@ def _b_vcutm():
 def _b_wmotr():
     surfs.extend(make_box(0, 0, 0, 300, 20, 300, (180,160,220)))
     rc = [(255,80,80),(255,165,80),(255,255,80),(80,255,80),(80,80,255),(180,80,255)]
-    for i in range(12):
-        a = i * 30; d = 300+i*80; surfs.extend(make_box(d*sins(a), 50+i*60, d*coss(a), 120, 15, 120, rc[i%6]))
+    for i, (sn, cs) in enumerate(_ring_dirs(12, 30)):
+        d = 300+i*80; surfs.extend(make_box(d*sn, 50+i*60, d*cs, 120, 15, 120, rc[i%6]))
     for cx, cy, cz in [(500,400,0),(-400,500,-300),(0,600,-600)]:
         surfs.extend(make_box(cx, cy, cz, 200, 30, 200, (240,240,255)))
     objs.append(sp_star(0, 650, -600, 0))
-    for i in range(8):
-        a = i * 45; objs.append(sp_coin(350*sins(a), 200+i*30, 350*coss(a), ObjType.COIN_RED))
+    for i, (sn, cs) in enumerate(_ring_dirs(8, 45)):
+        objs.append(sp_coin(350*sn, 200+i*30, 350*cs, ObjType.COIN_RED))
     objs.extend(sp_ring(0, 40, 0, 120, 8))
 
 _builders = {
@@ -937,68 +1072,83 @@ _builders = {
     LVL_SA:_b_sa, LVL_PSS:_b_pss, LVL_TOTWC:_b_totwc,
     LVL_COTMC:_b_cotmc, LVL_VCUTM:_b_vcutm, LVL_WMOTR:_b_wmotr,
 }
+_BUILDERS_FLAT = tuple(_builders.get(i, _b_grounds) for i in range(max(_builders) + 1))
 
 # ============================================================================
 #  COLLISION
 # ============================================================================
 def find_floor(x, y, z):
-    h = -11000.0; fl = None
-    for s in surfs:
-        mnx = min(v.x for v in s.verts) - 10; mxx = max(v.x for v in s.verts) + 10
-        mnz = min(v.z for v in s.verts) - 10; mxz = max(v.z for v in s.verts) + 10
+    h = -11000.0; fl = None; hi = -1; lim = y + 150
+    for top, mnx, mxx, mnz, mxz, nx, ny, nz, pd, i, s in _FLOOR_GRID.get((int(x) >> 8, int(z) >> 8), ()):
+        if top < h: break
         if x < mnx or x > mxx or z < mnz or z > mxz: continue
-        ny = s.normal.y
-        if abs(ny) < 0.01: continue
-        p1 = s.verts[0]; nx, nz = s.normal.x, s.normal.z
-        d = -(x * nx + z * nz - (nx * p1.x + ny * p1.y + nz * p1.z))
+        d = -(x * nx + z * nz - pd)
         sy = d / ny
-        if h < sy <= y + 150: h = sy; fl = s
+        if sy <= lim and (h < sy or (sy == h and i < hi)): h = sy; fl = s; hi = i
     return h, fl
 
 def find_wall(x, y, z, dx, dz):
     tx, tz = x + dx * 2, z + dz * 2
-    for s in surfs:
-        ny = s.normal.y
-        if abs(ny) > 0.7: continue
-        mny = min(v.y for v in s.verts) - 10; mxy = max(v.y for v in s.verts) + 10
+    for mny, mxy, nx, nz, px, pz, s in _WALL_BANDS.get(int(y) >> 8, ()):
         if y < mny or y > mxy: continue
-        p1 = s.verts[0]; nx, nz = s.normal.x, s.normal.z
-        d1 = (x - p1.x) * nx + (z - p1.z) * nz
-        d2 = (tx - p1.x) * nx + (tz - p1.z) * nz
+        d1 = (x - px) * nx + (z - pz) * nz
+        d2 = (tx - px) * nx + (tz - pz) * nz
         if d1 > 0 and d2 <= 0: return s
     return None
 
 # ============================================================================
 #  PHYSICS STEPS
 # ============================================================================
+# Unit facing vector, memoised per angle; facing is constant within one air_step
+@lru_cache(maxsize=256)
+def _face_dir(fy): return sins(fy), coss(fy)
+
 def update_air(m):
-    m.fvel *= AIR_DRAG
-    m.vel.x = m.fvel * sins(m.face.y); m.vel.z = m.fvel * coss(m.face.y)
-    m.vel.y += GRAVITY
-    if m.vel.y < MAX_FALL: m.vel.y = MAX_FALL
+    v = m.vel; fv = m.fvel * AIR_DRAG; sx, cz = _face_dir(m.face.y)
+    m.fvel = fv; v.x = fv * sx; v.z = fv * cz
+    vy = v.y + GRAVITY
+    v.y = MAX_FALL if vy < MAX_FALL else vy
 
 def set_fvel(m, s):
-    m.fvel = s; m.vel.x = s * sins(m.face.y); m.vel.z = s * coss(m.face.y)
+    sx, cz = _face_dir(m.face.y); v = m.vel
+    m.fvel = s; v.x = s * sx; v.z = s * cz
+
+# approach_f32(m.fvel, 0, inc) followed by set_fvel, without the two calls
+def decel_fvel(m, inc):
+    s = m.fvel
+    if s > inc: s -= inc
+    elif s < -inc: s += inc
+    else: s = 0
+    sx, cz = _face_dir(m.face.y); v = m.vel
+    m.fvel = s; v.x = s * sx; v.z = s * cz
+
+# Last ground probe and its answer; a standing Mario repeats the exact same query every frame
+_ground_memo = ((), (0.0, None))
 
 def ground_step(m):
-    m.pos.x += m.vel.x; m.pos.z += m.vel.z
-    fy, fl = find_floor(m.pos.x, m.pos.y + 100, m.pos.z)
+    global _ground_memo
+    p = m.pos; p.x += m.vel.x; p.z += m.vel.z
+    q = (p.x, p.y + 100, p.z)
+    if q == _ground_memo[0]: fy, fl = _ground_memo[1]
+    else: fy, fl = find_floor(*q); _ground_memo = (q, (fy, fl))
     m.floor = fl; m.floor_y = fy
-    if m.pos.y > fy + 10: return 'air'
-    m.pos.y = fy; return 'ground'
+    if p.y > fy + 10: return 'air'
+    p.y = fy; return 'ground'
 
 def air_step(m):
     qx, qy, qz = m.vel.x/4, m.vel.y/4, m.vel.z/4
+    # Facing is fixed for the whole step, so the wall probe direction is computed once
+    p = m.pos; wdx, wdz = _face_dir(m.face.y)
     for _ in range(4):
-        m.pos.x += qx; m.pos.y += qy; m.pos.z += qz
-        fy, fl = find_floor(m.pos.x, m.pos.y, m.pos.z)
+        p.x += qx; p.y += qy; p.z += qz
+        fy, fl = find_floor(p.x, p.y, p.z)
         m.floor = fl; m.floor_y = fy
-        if m.pos.y <= fy:
-            m.pos.y = fy
+        if p.y <= fy:
+            p.y = fy
             # Landing squish
             m.squish = 0.6; m.squish_vel = 0.15
             return 'land'
-        w = find_wall(m.pos.x, m.pos.y+50, m.pos.z, sins(m.face.y), coss(m.face.y))
+        w = find_wall(p.x, p.y+50, p.z, wdx, wdz)
         if w: m.wall = w; m.vel.x = 0; m.vel.z = 0; m.fvel = 0; return 'wall'
     return 'air'
 
@@ -1007,23 +1157,28 @@ def air_step(m):
 # ============================================================================
 def a_idle(m, c):
     m.fvel = 0; m.vel.x = m.vel.z = 0
-    if c.pressed & IN_A: m.jcount = 0; play_sfx('jump'); return m.set_act(ACT_JUMP)
-    if c.pressed & IN_Z: return m.set_act(ACT_CROUCH_IDLE)
-    if c.pressed & IN_B: play_sfx('punch'); return m.set_act(ACT_PUNCHING)
+    # Most frames have no fresh press, so the button ladders sit behind one test
+    p = c.pressed
+    if p:
+        if p & IN_A: m.jcount = 0; play_sfx('jump'); return m.set_act(ACT_JUMP)
+        if p & IN_Z: return m.set_act(ACT_CROUCH_IDLE)
+        if p & IN_B: play_sfx('punch'); return m.set_act(ACT_PUNCHING)
     if c.stick_mag > 0: return m.set_act(ACT_WALKING)
     ground_step(m)
 
 def a_walk(m, c):
     m.bob_phase += m.fvel * 0.15
-    if c.pressed & IN_A:
-        if m.fvel > 10 and c.down & IN_Z_D: play_sfx('jump'); return m.set_act(ACT_LONG_JUMP)
-        m.jtimer = 5; m.jcount += 1
-        if m.jcount >= 3 and m.fvel > 15: play_sfx('wahoo'); return m.set_act(ACT_TRIPLE_JUMP)
-        elif m.jcount >= 2: play_sfx('jump'); return m.set_act(ACT_DOUBLE_JUMP)
-        play_sfx('jump'); return m.set_act(ACT_JUMP)
-    if c.pressed & IN_B:
-        if m.fvel > 8: play_sfx('punch'); return m.set_act(ACT_SLIDE_KICK)
-        play_sfx('punch'); return m.set_act(ACT_PUNCHING)
+    p = c.pressed
+    if p:
+        if p & IN_A:
+            if m.fvel > 10 and c.down & IN_Z_D: play_sfx('jump'); return m.set_act(ACT_LONG_JUMP)
+            m.jtimer = 5; m.jcount += 1
+            if m.jcount >= 3 and m.fvel > 15: play_sfx('wahoo'); return m.set_act(ACT_TRIPLE_JUMP)
+            elif m.jcount >= 2: play_sfx('jump'); return m.set_act(ACT_DOUBLE_JUMP)
+            play_sfx('jump'); return m.set_act(ACT_JUMP)
+        if p & IN_B:
+            if m.fvel > 8: play_sfx('punch'); return m.set_act(ACT_SLIDE_KICK)
+            play_sfx('punch'); return m.set_act(ACT_PUNCHING)
     if c.stick_mag == 0: return m.set_act(ACT_DECELERATING)
     m.face.y = approach_angle(m.face.y, m.iyaw, 11.25)
     tgt = c.stick_mag * MAX_WALK
@@ -1034,12 +1189,14 @@ def a_walk(m, c):
     else: m.jcount = 0
 
 def a_decel(m, c):
-    if c.pressed & IN_A:
-        if m.fvel > 8: play_sfx('jump'); return m.set_act(ACT_SIDE_FLIP)
-        play_sfx('jump'); return m.set_act(ACT_JUMP)
-    if c.pressed & IN_B: play_sfx('punch'); return m.set_act(ACT_PUNCHING)
+    p = c.pressed
+    if p:
+        if p & IN_A:
+            if m.fvel > 8: play_sfx('jump'); return m.set_act(ACT_SIDE_FLIP)
+            play_sfx('jump'); return m.set_act(ACT_JUMP)
+        if p & IN_B: play_sfx('punch'); return m.set_act(ACT_PUNCHING)
     if c.stick_mag > 0: return m.set_act(ACT_WALKING)
-    m.fvel = approach_f32(m.fvel, 0, 2.0); set_fvel(m, m.fvel)
+    decel_fvel(m, 2.0)
     if abs(m.fvel) < 0.5: m.set_act(ACT_IDLE)
     ground_step(m)
 
@@ -1057,7 +1214,7 @@ def a_punch(m, c):
             elif m.punch_state == 1: m.punch_state = 2; play_sfx('punch'); return m.set_act(ACT_KICK)
         if m.atimer > 20: m.punch_state = 0; m.set_act(ACT_IDLE)
     if m.atimer < 5: m.fvel = 8; set_fvel(m, m.fvel)
-    else: m.fvel = approach_f32(m.fvel, 0, 2); set_fvel(m, m.fvel)
+    else: decel_fvel(m, 2)
     ground_step(m)
 
 def a_punch2(m, c):
@@ -1066,20 +1223,19 @@ def a_punch2(m, c):
         if c.pressed & IN_B: m.punch_state = 2; play_sfx('punch'); return m.set_act(ACT_KICK)
         if m.atimer > 20: m.punch_state = 0; m.set_act(ACT_IDLE)
     if m.atimer < 5: m.fvel = 10; set_fvel(m, m.fvel)
-    else: m.fvel = approach_f32(m.fvel, 0, 2); set_fvel(m, m.fvel)
+    else: decel_fvel(m, 2)
     ground_step(m)
 
 def a_kick(m, c):
     m.atimer += 1
     if m.atimer > 25: m.punch_state = 0; m.set_act(ACT_IDLE)
     if m.atimer < 8: m.fvel = 15; set_fvel(m, m.fvel)
-    else: m.fvel = approach_f32(m.fvel, 0, 1.5); set_fvel(m, m.fvel)
+    else: decel_fvel(m, 1.5)
     ground_step(m)
 
 def a_jump(m, c):
     if m.atimer == 0: m.vel.y = JUMP_VEL + abs(m.fvel) * 0.25; m.peak_y = m.pos.y
-    if c.pressed & IN_Z: return m.set_act(ACT_GROUND_POUND)
-    if c.pressed & IN_B: return m.set_act(ACT_DIVE)
+    if c.pressed & IN_ZB: return m.set_act(ACT_GROUND_POUND if c.pressed & IN_Z else ACT_DIVE)
     update_air(m); r = air_step(m)
     if r == 'land': m.set_act(ACT_WALKING if c.stick_mag > 0 else ACT_IDLE)
     elif r == 'wall': m.wktimer = 5; m.set_act(ACT_FREEFALL)
@@ -1087,8 +1243,7 @@ def a_jump(m, c):
 
 def a_dbl(m, c):
     if m.atimer == 0: m.vel.y = DBL_JUMP_VEL + abs(m.fvel) * 0.2; m.peak_y = m.pos.y
-    if c.pressed & IN_Z: return m.set_act(ACT_GROUND_POUND)
-    if c.pressed & IN_B: return m.set_act(ACT_DIVE)
+    if c.pressed & IN_ZB: return m.set_act(ACT_GROUND_POUND if c.pressed & IN_Z else ACT_DIVE)
     update_air(m); r = air_step(m)
     if r == 'land': m.set_act(ACT_WALKING if c.stick_mag > 0 else ACT_IDLE)
     elif r == 'wall': m.wktimer = 5; m.set_act(ACT_FREEFALL)
@@ -1120,11 +1275,13 @@ def a_longjump(m, c):
     m.atimer += 1
 
 def a_freefall(m, c):
-    if c.pressed & IN_A and m.wktimer > 0:
-        m.face.y = (m.face.y + 180) % 360; m.fvel = 24.0; set_fvel(m, m.fvel)
-        play_sfx('jump'); return m.set_act(ACT_WALL_KICK)
-    if c.pressed & IN_Z: return m.set_act(ACT_GROUND_POUND)
-    if c.pressed & IN_B: return m.set_act(ACT_DIVE)
+    p = c.pressed
+    if p:
+        if p & IN_A and m.wktimer > 0:
+            m.face.y = (m.face.y + 180) % 360; m.fvel = 24.0; set_fvel(m, m.fvel)
+            play_sfx('jump'); return m.set_act(ACT_WALL_KICK)
+        if p & IN_Z: return m.set_act(ACT_GROUND_POUND)
+        if p & IN_B: return m.set_act(ACT_DIVE)
     update_air(m); r = air_step(m)
     if r == 'land':
         play_sfx('stomp')
@@ -1147,7 +1304,7 @@ def a_dive(m, c):
 
 def a_belly(m, c):
     if c.pressed & IN_A: play_sfx('jump'); return m.set_act(ACT_JUMP)
-    m.fvel = approach_f32(m.fvel, 0, 1.0); set_fvel(m, m.fvel)
+    decel_fvel(m, 1.0)
     if abs(m.fvel) < 1.0: m.set_act(ACT_IDLE)
     ground_step(m)
 
@@ -1159,7 +1316,7 @@ def a_slide_kick(m, c):
 
 def a_slide_kick_slide(m, c):
     if c.pressed & IN_A: play_sfx('jump'); return m.set_act(ACT_JUMP)
-    m.fvel = approach_f32(m.fvel, 0, 0.8); set_fvel(m, m.fvel)
+    decel_fvel(m, 0.8)
     if abs(m.fvel) < 1.0: m.set_act(ACT_IDLE)
     ground_step(m)
 
@@ -1213,93 +1370,130 @@ ACT_MAP = {
     ACT_KNOCKBACK: a_knock, ACT_LAVA_BOOST: a_lava,
     ACT_STAR_DANCE: a_star, ACT_DEATH: a_death,
 }
+# Indexed by the low action-id bits, as in the original; unmapped ids idle
+ACT_TBL = [a_idle] * (ACT_ID_MASK + 1)
+for _a, _fn in ACT_MAP.items(): ACT_TBL[_a & ACT_ID_MASK] = _fn
 
 # ============================================================================
 #  OBJECT AI
 # ============================================================================
+def _upd_coin(o, mario, mx, mz, frame):
+    o.pos.y = o.home.y + 30 + bob_sin(frame * 0.08 + o.bob) * 10
+    o.angle = (o.angle + 6) % 360
+
+def _upd_star(o, mario, mx, mz, frame):
+    o.pos.y = o.home.y + 50 + bob_sin(frame * 0.06 + o.bob) * 15
+    o.angle = (o.angle + 3) % 360
+
+def _upd_1up(o, mario, mx, mz, frame):
+    o.pos.y = o.home.y + 30 + bob_sin(frame * 0.07 + o.bob) * 8
+
+def _upd_walker(o, mario, mx, mz, frame):
+    p = o.pos; dx = mx - p.x; dz = mz - p.z
+    d = math.sqrt(dx*dx + dz*dz)
+    if d < 400 and d > 0:
+        p.x += (dx/d) * o.spd; p.z += (dz/d) * o.spd
+        o.angle = math.degrees(math.atan2(dx, dz))
+    else:
+        o.timer += 1
+        if o.timer % 120 < 60: p.x += o.spd * o.pdir
+        else: p.x -= o.spd * o.pdir
+
+def _upd_bully(o, mario, mx, mz, frame):
+    p = o.pos; dx = mx - p.x; dz = mz - p.z
+    d = math.sqrt(dx*dx + dz*dz)
+    if d < 200 and d > 0:
+        p.x += (dx/d) * o.spd * 1.5; p.z += (dz/d) * o.spd * 1.5
+
+def _upd_boo(o, mario, mx, mz, frame):
+    p = o.pos; dx = mx - p.x; dz = mz - p.z
+    d = math.sqrt(dx*dx + dz*dz)
+    facing = abs(math.degrees(math.atan2(dx, dz)) - mario.face.y) < 90
+    if not facing and d < 400 and d > 0:
+        p.x += (dx/d) * 1.5; p.z += (dz/d) * 1.5
+    p.y = o.home.y + bob_sin(frame * 0.04) * 20
+
+def _upd_amp(o, mario, mx, mz, frame):
+    o.timer += 1; r = o.scale
+    o.pos.x = o.home.x + r * sins(o.timer * 3)
+    o.pos.z = o.home.z + r * coss(o.timer * 3)
+
+def _upd_thwomp(o, mario, mx, mz, frame):
+    p = o.pos
+    if o.state == 0:
+        if abs(mx - p.x) < 100 and abs(mz - p.z) < 100: o.state = 1; o.timer = 0
+    elif o.state == 1:
+        p.y = approach_f32(p.y, o.home.y - 200, 15)
+        if p.y <= o.home.y - 195: o.state = 2; o.timer = 0
+    elif o.state == 2:
+        o.timer += 1
+        if o.timer > 30: o.state = 3
+    elif o.state == 3:
+        p.y = approach_f32(p.y, o.home.y, 3)
+        if p.y >= o.home.y - 1: o.state = 0
+
+def _upd_chomp(o, mario, mx, mz, frame):
+    p = o.pos
+    o.timer += 1
+    if o.timer % 90 < 20:
+        dx = mx - o.home.x; dz = mz - o.home.z
+        d = math.sqrt(dx*dx + dz*dz)
+        if d < 300 and d > 0:
+            p.x = o.home.x + (dx/d) * 100 * (o.timer % 90) / 20
+            p.z = o.home.z + (dz/d) * 100 * (o.timer % 90) / 20
+    else:
+        p.x = approach_f32(p.x, o.home.x, 3)
+        p.z = approach_f32(p.z, o.home.z, 3)
+
+def _upd_piranha(o, mario, mx, mz, frame):
+    o.timer += 1; cy = o.timer % 120
+    if cy < 30: o.pos.y = approach_f32(o.pos.y, o.home.y + 60, 3)
+    elif cy > 90: o.pos.y = approach_f32(o.pos.y, o.home.y - 20, 3)
+
+def _upd_boss(o, mario, mx, mz, frame):
+    p = o.pos; dx = mx - p.x; dz = mz - p.z
+    d = math.sqrt(dx*dx + dz*dz)
+    if d < 500 and d > 0:
+        o.angle = math.degrees(math.atan2(dx, dz))
+        if d > 100: p.x += (dx/d) * o.spd; p.z += (dz/d) * o.spd
+
+# Per-type behaviours, like ACT_MAP; trees, pipes and boxes are static.
+# Handlers get Mario's x/z hoisted once per frame by update_objs
+OBJ_UPD = {
+    ObjType.COIN: _upd_coin, ObjType.COIN_RED: _upd_coin, ObjType.COIN_BLUE: _upd_coin,
+    ObjType.STAR: _upd_star, ObjType.ONE_UP: _upd_1up,
+    ObjType.GOOMBA: _upd_walker, ObjType.BOBOMB: _upd_walker, ObjType.KOOPA: _upd_walker,
+    ObjType.BULLY: _upd_bully, ObjType.BOO: _upd_boo, ObjType.BIG_BOO: _upd_boo,
+    ObjType.AMP: _upd_amp, ObjType.THWOMP: _upd_thwomp, ObjType.CHAIN_CHOMP: _upd_chomp,
+    ObjType.PIRANHA: _upd_piranha, ObjType.KING_BOB: _upd_boss, ObjType.BOWSER: _upd_boss,
+}
+
 def update_objs(mario, frame):
+    upd = OBJ_UPD.get
+    mx, mz = mario.pos.x, mario.pos.z
     for o in objs:
         if not o.active: continue
-        if o.type in (ObjType.COIN, ObjType.COIN_RED, ObjType.COIN_BLUE):
-            o.pos.y = o.home.y + 30 + math.sin(frame * 0.08 + o.bob) * 10
-            o.angle = (o.angle + 6) % 360
-        elif o.type == ObjType.STAR:
-            o.pos.y = o.home.y + 50 + math.sin(frame * 0.06 + o.bob) * 15
-            o.angle = (o.angle + 3) % 360
-        elif o.type == ObjType.ONE_UP:
-            o.pos.y = o.home.y + 30 + math.sin(frame * 0.07 + o.bob) * 8
-        elif o.type in (ObjType.GOOMBA, ObjType.BOBOMB, ObjType.KOOPA):
-            dx = mario.pos.x - o.pos.x; dz = mario.pos.z - o.pos.z
-            d = math.sqrt(dx*dx + dz*dz)
-            if d < 400 and d > 0:
-                o.pos.x += (dx/d) * o.spd; o.pos.z += (dz/d) * o.spd
-                o.angle = math.degrees(math.atan2(dx, dz))
-            else:
-                o.timer += 1
-                if o.timer % 120 < 60: o.pos.x += o.spd * o.pdir
-                else: o.pos.x -= o.spd * o.pdir
-        elif o.type == ObjType.BULLY:
-            dx = mario.pos.x - o.pos.x; dz = mario.pos.z - o.pos.z
-            d = math.sqrt(dx*dx + dz*dz)
-            if d < 200 and d > 0:
-                o.pos.x += (dx/d) * o.spd * 1.5; o.pos.z += (dz/d) * o.spd * 1.5
-        elif o.type in (ObjType.BOO, ObjType.BIG_BOO):
-            dx = mario.pos.x - o.pos.x; dz = mario.pos.z - o.pos.z
-            d = math.sqrt(dx*dx + dz*dz)
-            facing = abs(math.degrees(math.atan2(dx, dz)) - mario.face.y) < 90
-            if not facing and d < 400 and d > 0:
-                o.pos.x += (dx/d) * 1.5; o.pos.z += (dz/d) * 1.5
-            o.pos.y = o.home.y + math.sin(frame * 0.04) * 20
-        elif o.type == ObjType.AMP:
-            o.timer += 1; r = o.scale
-            o.pos.x = o.home.x + r * sins(o.timer * 3)
-            o.pos.z = o.home.z + r * coss(o.timer * 3)
-        elif o.type == ObjType.THWOMP:
-            dx = abs(mario.pos.x - o.pos.x); dz = abs(mario.pos.z - o.pos.z)
-            if o.state == 0:
-                if dx < 100 and dz < 100: o.state = 1; o.timer = 0
-            elif o.state == 1:
-                o.pos.y = approach_f32(o.pos.y, o.home.y - 200, 15)
-                if o.pos.y <= o.home.y - 195: o.state = 2; o.timer = 0
-            elif o.state == 2:
-                o.timer += 1
-                if o.timer > 30: o.state = 3
-            elif o.state == 3:
-                o.pos.y = approach_f32(o.pos.y, o.home.y, 3)
-                if o.pos.y >= o.home.y - 1: o.state = 0
-        elif o.type == ObjType.CHAIN_CHOMP:
-            o.timer += 1
-            if o.timer % 90 < 20:
-                dx = mario.pos.x - o.home.x; dz = mario.pos.z - o.home.z
-                d = math.sqrt(dx*dx + dz*dz)
-                if d < 300 and d > 0:
-                    o.pos.x = o.home.x + (dx/d) * 100 * (o.timer % 90) / 20
-                    o.pos.z = o.home.z + (dz/d) * 100 * (o.timer % 90) / 20
-            else:
-                o.pos.x = approach_f32(o.pos.x, o.home.x, 3)
-                o.pos.z = approach_f32(o.pos.z, o.home.z, 3)
-        elif o.type == ObjType.PIRANHA:
-            o.timer += 1; cy = o.timer % 120
-            if cy < 30: o.pos.y = approach_f32(o.pos.y, o.home.y + 60, 3)
-            elif cy > 90: o.pos.y = approach_f32(o.pos.y, o.home.y - 20, 3)
-        elif o.type in (ObjType.KING_BOB, ObjType.BOWSER):
-            dx = mario.pos.x - o.pos.x; dz = mario.pos.z - o.pos.z
-            d = math.sqrt(dx*dx + dz*dz)
-            if d < 500 and d > 0:
-                o.angle = math.degrees(math.atan2(dx, dz))
-                if d > 100: o.pos.x += (dx/d) * o.spd; o.pos.z += (dz/d) * o.spd
+        fn = upd(o.type)
+        if fn: fn(o, mario, mx, mz, frame)
         if o.flash > 0: o.flash -= 1
 
 def interact_objs(mario):
-    is_attacking = mario.action in (ACT_PUNCHING, ACT_PUNCH2, ACT_KICK, ACT_SLIDE_KICK, ACT_SLIDE_KICK_SL)
+    is_attacking = mario.action in ACTS_ATTACK
+    mp = mario.pos
     for o in objs:
         if not o.active or o.collected: continue
-        dx = mario.pos.x - o.pos.x; dy = mario.pos.y - o.pos.y; dz = mario.pos.z - o.pos.z
+        # Axis rejection first; d >= |dx|, |dz| so nothing in range is skipped
+        p = o.pos; r = o.irange + 30
+        dx = mp.x - p.x
+        if dx > r or dx < -r: continue
+        dz = mp.z - p.z
+        if dz > r or dz < -r: continue
+        dy = mp.y - p.y
         d = math.sqrt(dx*dx + dy*dy + dz*dz)
-        if d > o.irange + 30: continue
+        if d > r: continue
         if o.type in (ObjType.COIN, ObjType.COIN_RED, ObjType.COIN_BLUE):
             o.collected = True; o.active = False; mario.coins += o.coins; mario.heal(0x40 * o.coins)
-            ptcl.emit(o.pos, 8, o.color, 4.0, 15); play_sfx('coin')
+            ptcl.emit(o.pos, 8, o.color, 4.0, 15); play_coin()
         elif o.type == ObjType.STAR:
             if not mario.has_star(cur_lvl, o.star_id):
                 o.collected = True; o.active = False
@@ -1315,7 +1509,7 @@ def interact_objs(mario):
             if mario.vel.y < -5 and mario.pos.y > o.pos.y + 20:
                 o.active = False; mario.vel.y = 30.0; mario.coins += 1
                 ptcl.emit(o.pos, 10, o.color, 4.0, 15); play_sfx('stomp')
-            elif mario.action in (ACT_DIVE, ACT_GP_LAND) or is_attacking:
+            elif mario.action in ACTS_STOMP or is_attacking:
                 o.active = False; mario.coins += 1
                 ptcl.emit(o.pos, 10, o.color, 4.0, 15); play_sfx('stomp')
             else:
@@ -1327,7 +1521,7 @@ def interact_objs(mario):
                 mario.pos.x += px; mario.pos.z += pz; mario.fvel = 15
         elif o.type in (ObjType.BOO, ObjType.BIG_BOO):
             fb = abs(math.degrees(math.atan2(o.pos.x-mario.pos.x, o.pos.z-mario.pos.z)) - mario.face.y) > 90
-            if fb and (mario.action in (ACT_GROUND_POUND, ACT_GP_LAND) or is_attacking):
+            if fb and (mario.action in ACTS_POUND or is_attacking):
                 o.hp -= 1; o.flash = 10
                 if o.hp <= 0: o.active = False; ptcl.emit(o.pos, 15, (220,220,255), 5.0, 20)
             elif not fb and d < o.irange:
@@ -1377,171 +1571,187 @@ class LakituCam:
         self.dist += (self.target_dist - self.dist) * 0.05
 
         # Focus point (slightly ahead of Mario)
-        fx = mario.pos.x + sins(mario.face.y) * 50
-        fy = mario.pos.y + 120
-        fz = mario.pos.z + coss(mario.face.y) * 50
+        mp = mario.pos; sx, cz = _face_dir(mario.face.y)
+        fx = mp.x + sx * 50
+        fy = mp.y + 120
+        fz = mp.z + cz * 50
 
         # Smooth follow
-        self.focus.x += (fx - self.focus.x) * 0.12
-        self.focus.y += (fy - self.focus.y) * 0.08
-        self.focus.z += (fz - self.focus.z) * 0.12
+        f = self.focus
+        f.x += (fx - f.x) * 0.12
+        f.y += (fy - f.y) * 0.08
+        f.z += (fz - f.z) * 0.12
 
         # Position camera behind & above Mario
-        wx = self.focus.x - sins(self.yaw) * coss(self.pitch) * self.dist
-        wy = self.focus.y + sins(self.pitch) * self.dist * 0.5 + 200
-        wz = self.focus.z - coss(self.yaw) * coss(self.pitch) * self.dist
+        wx = f.x - sins(self.yaw) * coss(self.pitch) * self.dist
+        wy = f.y + sins(self.pitch) * self.dist * 0.5 + 200
+        wz = f.z - coss(self.yaw) * coss(self.pitch) * self.dist
 
-        self.pos.x += (wx - self.pos.x) * 0.1
-        self.pos.y += (wy - self.pos.y) * 0.1
-        self.pos.z += (wz - self.pos.z) * 0.1
+        p = self.pos
+        p.x += (wx - p.x) * 0.1
+        p.y += (wy - p.y) * 0.1
+        p.z += (wz - p.z) * 0.1
 
 # ============================================================================
 #  RENDERER — Enhanced 3D
 # ============================================================================
-def rot_pt(v, cx, cy, cz, ay, ap=0):
-    x, y, z = v.x - cx, v.y - cy, v.z - cz
-    r = math.radians(ay); c, s = math.cos(r), math.sin(r)
-    rx, rz = x*c - z*s, x*s + z*c
-    if ap != 0:
-        rp = math.radians(ap); cp, sp = math.cos(rp), math.sin(rp)
-        ry = y * cp - rz * sp; rz = y * sp + rz * cp
-        return rx, ry, rz
-    return rx, y, rz
+# Sky gradients only depend on the level's sky colour, so each one is drawn once and blitted
+_sky_cache: Dict[Tuple[int, int, int], pygame.Surface] = {}
 
 def draw_sky(screen, info, frame):
     sky = info.sky
-    for y in range(0, HEIGHT, 4):
-        t = y / HEIGHT
-        r = int(sky[0] * (1 - t * 0.4) + 10 * t)
-        g = int(sky[1] * (1 - t * 0.4) + 10 * t)
-        b = int(sky[2] * (1 - t * 0.3) + 20 * t)
-        pygame.draw.line(screen, _cc((r, g, b)), (0, y), (WIDTH, y))
-        if y < 3:
-            pygame.draw.line(screen, _cc((r, g, b)), (0, y+1), (WIDTH, y+1))
-            pygame.draw.line(screen, _cc((r, g, b)), (0, y+2), (WIDTH, y+2))
-            pygame.draw.line(screen, _cc((r, g, b)), (0, y+3), (WIDTH, y+3))
+    bg = _sky_cache.get(sky)
+    if bg is None:
+        bg = _sky_cache[sky] = pygame.Surface((WIDTH, HEIGHT)).convert()
+        for y in range(0, HEIGHT, 4):
+            t = y / HEIGHT
+            r = int(sky[0] * (1 - t * 0.4) + 10 * t)
+            g = int(sky[1] * (1 - t * 0.4) + 10 * t)
+            b = int(sky[2] * (1 - t * 0.3) + 20 * t)
+            bg.fill(_cc((r, g, b)), (0, y, WIDTH, 4))
+    screen.blit(bg, (0, 0))
+
+# Standing Mario parts as (dx, dy, dz, w, h, d, colour); a None colour takes the shirt/hat
+# colour for the frame. Legs and arms hang off the bobbing body, arms also off the punch
+# extension, and head parts off the head centre.
+_MARIO_LEGS = ((-10, 20, 0, 14, 40, 14, (30,30,180)), (10, 20, 0, 14, 40, 14, (30,30,180)))
+_MARIO_ARMS = ((-25, 60, 0, 10, 10, 18, None), (25, 60, 0, 10, 10, 18, None),
+               (-25, 60, 12, 8, 8, 8, (255,255,255)), (25, 60, 12, 8, 8, 8, (255,255,255)))
+_MARIO_HEAD = ((0, 0, 0, 28, 28, 28, (255,200,160)), (0, 14, 0, 32, 8, 32, None),
+               (0, 2, 16, 30, 4, 10, None), (0, -5, 14, 16, 4, 4, (60,30,10)),
+               (0, -1, 16, 8, 6, 6, (240,180,140)))
 
 def render(screen, mario, cam, frame):
-    info = LI.get(cur_lvl, LI[0])
+    info = LI_FLAT[cur_lvl]
     draw_sky(screen, info, frame)
     sky = info.sky
 
+    cx, cy, cz = cam.pos.x, cam.pos.y, cam.pos.z
+    r = math.radians(-cam.yaw); c, s = math.cos(r), math.sin(r)
+    # Drop level surfaces whose bounding sphere is wholly behind the near plane, beyond the
+    # far plane or past a screen edge; none of their pixels could land on screen
     rlist = []
-    for s in surfs: rlist.append(('e', s))
+    for sf, (bx, by, bz, br) in zip(surfs, _SURF_BOUNDS):
+        x, z = bx - cx, bz - cz
+        rz = x*s + z*c
+        if rz + br <= NEAR_CLIP or rz - br > FAR_CLIP: continue
+        if rz*_FRUSTUM_HZ - abs(x*c - z*s)*_FRUSTUM_HX < -br: continue
+        if rz*_FRUSTUM_VZ - abs(by - cy)*_FRUSTUM_VY < -br: continue
+        rlist.append(('e', sf, 0, 0, 0))
     for o in objs:
         if not o.active: continue
         if o.type == ObjType.TREE:
-            for ts in make_box(o.pos.x, o.pos.y+o.height/2, o.pos.z, 25, o.height, 25, (100,65,30)):
-                rlist.append(('o', ts))
-            for cs in make_box(o.pos.x, o.pos.y+o.height+50, o.pos.z, 100, 100, 100, (30,140,30)):
-                rlist.append(('o', cs))
+            _push_box(rlist, 'o', o.pos.x, o.pos.y+o.height/2, o.pos.z, 25, o.height, 25, (100,65,30))
+            _push_box(rlist, 'o', o.pos.x, o.pos.y+o.height+50, o.pos.z, 100, 100, 100, (30,140,30))
         elif o.type == ObjType.PIPE:
-            for ps in make_box(o.pos.x, o.pos.y+40, o.pos.z, 65, 80, 65, o.color):
-                rlist.append(('o', ps))
-            for ps in make_box(o.pos.x, o.pos.y+85, o.pos.z, 75, 10, 75, _cc((o.color[0]*0.8, o.color[1]*0.8, o.color[2]*0.8))):
-                rlist.append(('o', ps))
+            _push_box(rlist, 'o', o.pos.x, o.pos.y+40, o.pos.z, 65, 80, 65, o.color)
+            _push_box(rlist, 'o', o.pos.x, o.pos.y+85, o.pos.z, 75, 10, 75, _cc((o.color[0]*0.8, o.color[1]*0.8, o.color[2]*0.8)))
         else:
             sz = o.radius * o.scale
             col = (255,255,255) if o.flash > 0 and o.flash % 2 == 0 else o.color
-            for os in make_box(o.pos.x, o.pos.y+o.height*o.scale/2, o.pos.z, sz, o.height*o.scale, sz, col):
-                rlist.append(('o', os))
+            _push_box(rlist, 'o', o.pos.x, o.pos.y+o.height*o.scale/2, o.pos.z, sz, o.height*o.scale, sz, col)
 
     # Mario model — proper body parts
     sq = mario.squish
-    is_crouch = mario.action in (ACT_CROUCH_IDLE, ACT_BELLY_SLIDE, ACT_SLIDE_KICK_SL)
-    is_dive = mario.action in (ACT_DIVE, ACT_SLIDE_KICK)
+    is_crouch = mario.action in ACTS_CROUCH
+    is_dive = mario.action in ACTS_DIVE
     mc = (255, 20, 20)
     if mario.hurt > 0: mc = (255, 150, 150) if frame % 4 < 2 else (255, 20, 20)
     elif mario.inv > 0 and mario.inv % 4 < 2: mc = (255, 200, 200)
     skin = (255, 200, 160)
-    blue = (30, 30, 180)
     hat_c = mc
 
     if is_dive:
         bh = 15; by = mario.pos.y + 15
-        for ms in make_box(mario.pos.x, by, mario.pos.z, 35, 30, 60, mc): rlist.append(('m', ms))
-        for ms in make_box(mario.pos.x, by, mario.pos.z + 35, 25, 25, 25, skin): rlist.append(('m', ms))
+        _push_box(rlist, 'm', mario.pos.x, by, mario.pos.z, 35, 30, 60, mc)
+        _push_box(rlist, 'm', mario.pos.x, by, mario.pos.z + 35, 25, 25, 25, skin)
     elif is_crouch:
         bh = 25
-        for ms in make_box(mario.pos.x, mario.pos.y + bh, mario.pos.z, 38*sq, bh*2*sq, 38, mc): rlist.append(('m', ms))
+        _push_box(rlist, 'm', mario.pos.x, mario.pos.y + bh, mario.pos.z, 38*sq, bh*2*sq, 38, mc)
         hy = mario.pos.y + bh * 2 + 5
-        for mh in make_box(mario.pos.x, hy, mario.pos.z, 28, 28, 28, skin): rlist.append(('m', mh))
-        for hs in make_box(mario.pos.x, hy + 12, mario.pos.z, 32, 8, 32, hat_c): rlist.append(('m', hs))
+        _push_box(rlist, 'm', mario.pos.x, hy, mario.pos.z, 28, 28, 28, skin)
+        _push_box(rlist, 'm', mario.pos.x, hy + 12, mario.pos.z, 32, 8, 32, hat_c)
     else:
         bh = 55 * sq
-        bob_y = math.sin(mario.bob_phase) * 2 if mario.action == ACT_WALKING else 0
-        # Legs (blue overalls)
-        for ms in make_box(mario.pos.x-10, mario.pos.y + 20 + bob_y, mario.pos.z, 14, 40, 14, blue): rlist.append(('m', ms))
-        for ms in make_box(mario.pos.x+10, mario.pos.y + 20 + bob_y, mario.pos.z, 14, 40, 14, blue): rlist.append(('m', ms))
+        bob_y = bob_sin(mario.bob_phase) * 2 if mario.action == ACT_WALKING else 0
+        px, py, pz = mario.pos.x, mario.pos.y, mario.pos.z
+        for dx, dy, dz, w, h, d, col in _MARIO_LEGS:
+            _push_box(rlist, 'm', px + dx, py + dy + bob_y, pz + dz, w, h, d, col)
         # Body (red shirt)
-        for ms in make_box(mario.pos.x, mario.pos.y + 55 + bob_y, mario.pos.z, 36*sq, 40*sq, 30, mc): rlist.append(('m', ms))
-        # Arms
+        _push_box(rlist, 'm', px, py + 55 + bob_y, pz, 36*sq, 40*sq, 30, mc)
         arm_ext = 12
-        if mario.action in (ACT_PUNCHING, ACT_PUNCH2, ACT_KICK):
+        if mario.action in ACTS_PUNCH:
             arm_ext = 25 if mario.atimer < 8 else 12
-        for ms in make_box(mario.pos.x - 25, mario.pos.y + 60 + bob_y, mario.pos.z + arm_ext, 10, 10, 18, mc): rlist.append(('m', ms))
-        for ms in make_box(mario.pos.x + 25, mario.pos.y + 60 + bob_y, mario.pos.z + arm_ext, 10, 10, 18, mc): rlist.append(('m', ms))
-        # Hands (white gloves)
-        for ms in make_box(mario.pos.x - 25, mario.pos.y + 60 + bob_y, mario.pos.z + arm_ext + 12, 8, 8, 8, (255,255,255)): rlist.append(('m', ms))
-        for ms in make_box(mario.pos.x + 25, mario.pos.y + 60 + bob_y, mario.pos.z + arm_ext + 12, 8, 8, 8, (255,255,255)): rlist.append(('m', ms))
-        # Head
-        hy = mario.pos.y + 82 + bob_y
-        for mh in make_box(mario.pos.x, hy, mario.pos.z, 28, 28, 28, skin): rlist.append(('m', mh))
-        # Hat
-        for hs in make_box(mario.pos.x, hy + 14, mario.pos.z, 32, 8, 32, hat_c): rlist.append(('m', hs))
-        # Hat brim
-        for hb in make_box(mario.pos.x, hy + 2, mario.pos.z + 16, 30, 4, 10, hat_c): rlist.append(('m', hb))
-        # Mustache (dark)
-        for mu in make_box(mario.pos.x, hy - 5, mario.pos.z + 14, 16, 4, 4, (60,30,10)): rlist.append(('m', mu))
-        # Nose
-        for no in make_box(mario.pos.x, hy - 1, mario.pos.z + 16, 8, 6, 6, (240,180,140)): rlist.append(('m', no))
+        for dx, dy, dz, w, h, d, col in _MARIO_ARMS:
+            _push_box(rlist, 'm', px + dx, py + dy + bob_y, pz + arm_ext + dz, w, h, d, col or mc)
+        hy = py + 82 + bob_y
+        for dx, dy, dz, w, h, d, col in _MARIO_HEAD:
+            _push_box(rlist, 'm', px + dx, hy + dy, pz + dz, w, h, d, col or hat_c)
 
     # Shadow
     if mario.floor:
         sh_scale = max(0.3, 1.0 - (mario.pos.y - mario.floor_y) / 500)
         sz = int(30 * sh_scale)
-        for ss in make_box(mario.pos.x, mario.floor_y + 2, mario.pos.z, sz, 2, sz, (10,10,10)):
-            rlist.append(('s', ss))
+        _push_box(rlist, 's', mario.pos.x, mario.floor_y + 2, mario.pos.z, sz, 2, sz, (10,10,10))
 
     # Particles
     for p in ptcl.ps:
-        for ps in make_box(p.pos.x, p.pos.y, p.pos.z, p.size, p.size, p.size, p.color):
-            rlist.append(('p', ps))
+        # Burst particles share one size and a few colours, so they reuse cached boxes;
+        # sparkle and smoke sizes are random per particle and are built in place
+        if p.kind == 0: _push_box(rlist, 'p', p.x, p.y, p.z, p.size, p.size, p.size, p.color); continue
+        for ps in make_box(p.x, p.y, p.z, p.size, p.size, p.size, p.color):
+            rlist.append(('p', ps, 0, 0, 0))
 
-    # Project and sort
+    # Project and sort (camera yaw trig is the same for every vertex, so rot_pt is inlined)
     polys = []
-    for rt, sf in rlist:
+    hw, hh = WIDTH/2, HEIGHT/2; sr, sg, sb = sky
+    for rt, sf, ox, oy, oz in rlist:
         pv = []; az = 0; visible = False
         for v in sf.verts:
-            rx, ry, rz = rot_pt(v, cam.pos.x, cam.pos.y, cam.pos.z, -cam.yaw)
+            x, z = v.x + ox - cx, v.z + oz - cz
+            rz = x*s + z*c
             if rz > NEAR_CLIP:
                 visible = True; sc = FOV / rz
-                pv.append((WIDTH/2 + rx * sc, HEIGHT/2 - ry * sc))
+                pv.append((hw + (x*c - z*s) * sc, hh - (v.y + oy - cy) * sc))
                 az += rz
         if visible and len(pv) >= 3:
             az /= len(sf.verts)
             if az > FAR_CLIP: continue
-            col = sf.color if rt != 's' else (10, 10, 10)
-            # Distance fog
-            f = clamp(az / FAR_CLIP, 0, 1)
+            r, g, b = sf.color if rt != 's' else (10, 10, 10)
+            # Distance fog; 0 < az <= FAR_CLIP here, so f needs no clamping
+            f = az / FAR_CLIP
             f = f * f  # Quadratic falloff for more natural fog
-            fc = (int(col[0]*(1-f) + sky[0]*f),
-                  int(col[1]*(1-f) + sky[1]*f),
-                  int(col[2]*(1-f) + sky[2]*f))
+            k = 1 - f
+            fc = _cc((int(r*k + sr*f), int(g*k + sg*f), int(b*k + sb*f)))
             polys.append((az, fc, pv, rt))
 
-    polys.sort(key=lambda x: x[0], reverse=True)
+    polys.sort(key=itemgetter(0), reverse=True)
+    draw_poly = pygame.draw.polygon
     for z, col, pts, rt in polys:
-        col = _cc(col)
-        pygame.draw.polygon(screen, col, pts)
-        # Wireframe for nearby geometry
+        draw_poly(screen, col, pts)
+        # Wireframe for nearby geometry; col is already in range, so the darker edge needs no _cc
         if z < 2500 and rt not in ('s', 'p'):
-            ec = _cc((col[0]*0.6, col[1]*0.6, col[2]*0.6))
-            pygame.draw.polygon(screen, ec, pts, 1)
+            draw_poly(screen, (int(col[0]*0.6), int(col[1]*0.6), int(col[2]*0.6)), pts, 1)
 
 # ============================================================================
 #  HUD — Authentic SM64 Style
 # ============================================================================
+# Font surfaces for HUD and menu text; most strings repeat frame after frame
+@lru_cache(maxsize=1024)
+def rtext(font, s, col): return font.render(s, True, col)
+
+def _hp_wedge(i, hx, hy, hr, steps=4):
+    a1 = math.radians(90 - i * 45)
+    a2 = math.radians(90 - (i + 1) * 45)
+    pts = [(hx, hy)]
+    for s in range(steps + 1):
+        a = a1 + (a2 - a1) * s / steps
+        pts.append((hx + hr * math.cos(a), hy - hr * math.sin(a)))
+    return pts
+
+# The power meter never moves, so its eight wedge polygons are built once
+_HP_WEDGES = tuple(_hp_wedge(i, 68, HEIGHT - 68, 40) for i in range(8))
+
 def draw_hud(screen, mario, fonts, frame):
     ft, fu, fs = fonts
 
@@ -1551,41 +1761,30 @@ def draw_hud(screen, mario, fonts, frame):
     pygame.draw.circle(screen, (20, 20, 20), (hx, hy), hr + 4)
     pygame.draw.circle(screen, (40, 40, 60), (hx, hy), hr + 2)
     w = mario.wedges()
-    for i in range(8):
-        a1 = math.radians(90 - i * 45)
-        a2 = math.radians(90 - (i + 1) * 45)
-        if i < w:
-            if w > 4: c = (80, 210, 80)
-            elif w > 2: c = (220, 220, 50)
-            else: c = (220, 60, 60)
-            pts = [(hx, hy)]
-            steps = 4
-            for s in range(steps + 1):
-                a = a1 + (a2 - a1) * s / steps
-                pts.append((hx + hr * math.cos(a), hy - hr * math.sin(a)))
-            pygame.draw.polygon(screen, c, pts)
+    c = (80, 210, 80) if w > 4 else (220, 220, 50) if w > 2 else (220, 60, 60)
+    for pts in _HP_WEDGES[:w]: pygame.draw.polygon(screen, c, pts)
     pygame.draw.circle(screen, (255, 255, 255), (hx, hy), hr, 3)
     pygame.draw.circle(screen, (200, 200, 200), (hx, hy), hr - 2, 1)
 
     # === Star Counter (top-left, like SM64) ===
-    star_surf = fu.render("\u2605", True, (255, 255, 50))
+    star_surf = rtext(fu, "\u2605", (255, 255, 50))
     screen.blit(star_surf, (20, 15))
-    star_x = fu.render(f"x {mario.stars}", True, (255, 255, 255))
+    star_x = rtext(fu, f"x {mario.stars}", (255, 255, 255))
     screen.blit(star_x, (48, 17))
 
     # === Coin Counter (top-left, under stars) ===
-    coin_icon = fu.render("\u25CF", True, (255, 215, 0))
+    coin_icon = rtext(fu, "\u25CF", (255, 215, 0))
     screen.blit(coin_icon, (20, 48))
-    coin_txt = fu.render(f"x {mario.coins}", True, (255, 255, 255))
+    coin_txt = rtext(fu, f"x {mario.coins}", (255, 255, 255))
     screen.blit(coin_txt, (42, 50))
 
     # === Lives (top-right area like SM64) ===
-    lives_txt = fu.render(f"MARIO  x {mario.lives}", True, (255, 255, 255))
+    lives_txt = rtext(fu, f"MARIO  x {mario.lives}", (255, 255, 255))
     screen.blit(lives_txt, (WIDTH - lives_txt.get_width() - 20, 15))
 
     # === Level Name (top-center) ===
-    lt = fu.render(cur_name, True, (255, 255, 220))
-    lts = fu.render(cur_name, True, (40, 40, 40))
+    lt = rtext(fu, cur_name, (255, 255, 220))
+    lts = rtext(fu, cur_name, (40, 40, 40))
     screen.blit(lts, (WIDTH // 2 - lt.get_width() // 2 + 2, 17))
     screen.blit(lt, (WIDTH // 2 - lt.get_width() // 2, 15))
 
@@ -1613,74 +1812,94 @@ def draw_hud(screen, mario, fonts, frame):
 # ============================================================================
 #  TITLE SCREEN — SM64 Authentic
 # ============================================================================
+# pygame-ce's fblits skips building the per-blit Rect list; plain pygame falls back to blits
+_fblits = getattr(pygame.Surface, 'fblits', pygame.Surface.blits)
+
+_title_sky: Optional[pygame.Surface] = None
+_title_face: Optional[pygame.Surface] = None
+_title_cloud: Optional[pygame.Surface] = None
+_FACE_W, _FACE_H, _FACE_CX, _FACE_CY = 144, 144, 72, 82
+
+def _build_title_face():
+    # Drawn around a local centre; the face spans x -70..70 and y -80..60 of it
+    face = pygame.Surface((_FACE_W, _FACE_H), pygame.SRCALPHA)
+    cx, cy = _FACE_CX, _FACE_CY
+    # Face
+    pygame.draw.circle(face, (255, 200, 170), (cx, cy), 60)
+    # Hat
+    pygame.draw.rect(face, (255, 0, 0), (cx - 65, cy - 80, 130, 50), border_radius=8)
+    pygame.draw.rect(face, (255, 0, 0), (cx + 5, cy - 30, 65, 20), border_radius=4)
+    # Hat "M" circle
+    pygame.draw.circle(face, (255, 255, 255), (cx, cy - 60), 22)
+    mf = pygame.font.SysFont('Arial Black', 26)
+    m_txt = mf.render("M", True, (255, 0, 0))
+    face.blit(m_txt, (cx - m_txt.get_width() // 2, cy - 73))
+    # Eyes
+    pygame.draw.ellipse(face, (255, 255, 255), (cx - 28, cy - 22, 20, 22))
+    pygame.draw.ellipse(face, (255, 255, 255), (cx + 8, cy - 22, 20, 22))
+    pygame.draw.ellipse(face, (0, 80, 180), (cx - 23, cy - 18, 12, 16))
+    pygame.draw.ellipse(face, (0, 80, 180), (cx + 13, cy - 18, 12, 16))
+    pygame.draw.ellipse(face, (0, 0, 0), (cx - 20, cy - 15, 6, 10))
+    pygame.draw.ellipse(face, (0, 0, 0), (cx + 16, cy - 15, 6, 10))
+    # Nose
+    pygame.draw.ellipse(face, (200, 140, 110), (cx - 12, cy + 2, 24, 18))
+    # Mustache
+    pygame.draw.ellipse(face, (60, 30, 10), (cx - 30, cy + 12, 60, 22))
+    # Ears
+    pygame.draw.circle(face, (255, 190, 160), (cx - 55, cy - 5), 15)
+    pygame.draw.circle(face, (255, 190, 160), (cx + 55, cy - 5), 15)
+    return face
+
 def draw_title(screen, fonts, frame):
+    global _title_sky, _title_face, _title_cloud
     ft, fu, fs = fonts
-    # Sky gradient
-    for y in range(HEIGHT):
-        t = y / HEIGHT
-        r = int(20 + t * 40); g = int(10 + t * 30); b = int(60 + t * 140)
-        pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y))
+    # Sky gradient, drawn once and blitted
+    if _title_sky is None:
+        _title_sky = pygame.Surface((WIDTH, HEIGHT)).convert()
+        for y in range(HEIGHT):
+            t = y / HEIGHT
+            r = int(20 + t * 40); g = int(10 + t * 30); b = int(60 + t * 140)
+            _title_sky.fill((r, g, b), (0, y, WIDTH, 1))
+    screen.blit(_title_sky, (0, 0))
 
     # Clouds
-    for i in range(5):
-        cx = (frame * 0.3 + i * 200) % (WIDTH + 200) - 100
-        cy = 80 + i * 40 + math.sin(frame * 0.01 + i) * 10
-        pygame.draw.ellipse(screen, (60, 60, 120), (cx, cy, 120, 40))
-        pygame.draw.ellipse(screen, (70, 70, 130), (cx + 20, cy - 10, 80, 30))
+    if _title_cloud is None:
+        _title_cloud = pygame.Surface((120, 50), pygame.SRCALPHA)
+        pygame.draw.ellipse(_title_cloud, (60, 60, 120), (0, 10, 120, 40))
+        pygame.draw.ellipse(_title_cloud, (70, 70, 130), (20, 0, 80, 30))
+    _fblits(screen, [(_title_cloud, ((frame * 0.3 + i * 200) % (WIDTH + 200) - 100,
+                                     80 + i * 40 + math.sin(frame * 0.01 + i) * 10 - 10)) for i in range(5)])
 
     # Title text with shadow
     off = math.sin(frame * 0.04) * 12
     title = "SUPER MARIO 64"
-    t = ft.render(title, True, (255, 215, 0))
-    ts = ft.render(title, True, (80, 60, 0))
+    t = rtext(ft, title, (255, 215, 0))
+    ts = rtext(ft, title, (80, 60, 0))
     tx = WIDTH // 2 - t.get_width() // 2
     screen.blit(ts, (tx + 4, 80 + off + 4))
     screen.blit(t, (tx, 80 + off))
 
     # Subtitle
-    sub = fu.render("Cat's PC Port — Python Edition v5.0", True, (200, 200, 255))
+    sub = rtext(fu, "Cat's PC Port — Python Edition v5.0", (200, 200, 255))
     screen.blit(sub, (WIDTH // 2 - sub.get_width() // 2, 155 + off))
 
-    # Mario face (improved)
-    cx, cy = WIDTH // 2, 310
-    # Face
-    pygame.draw.circle(screen, (255, 200, 170), (cx, cy), 60)
-    # Hat
-    pygame.draw.rect(screen, (255, 0, 0), (cx - 65, cy - 80, 130, 50), border_radius=8)
-    pygame.draw.rect(screen, (255, 0, 0), (cx + 5, cy - 30, 65, 20), border_radius=4)
-    # Hat "M" circle
-    pygame.draw.circle(screen, (255, 255, 255), (cx, cy - 60), 22)
-    mf = pygame.font.SysFont('Arial Black', 26)
-    m_txt = mf.render("M", True, (255, 0, 0))
-    screen.blit(m_txt, (cx - m_txt.get_width() // 2, cy - 73))
-    # Eyes
-    pygame.draw.ellipse(screen, (255, 255, 255), (cx - 28, cy - 22, 20, 22))
-    pygame.draw.ellipse(screen, (255, 255, 255), (cx + 8, cy - 22, 20, 22))
-    pygame.draw.ellipse(screen, (0, 80, 180), (cx - 23, cy - 18, 12, 16))
-    pygame.draw.ellipse(screen, (0, 80, 180), (cx + 13, cy - 18, 12, 16))
-    pygame.draw.ellipse(screen, (0, 0, 0), (cx - 20, cy - 15, 6, 10))
-    pygame.draw.ellipse(screen, (0, 0, 0), (cx + 16, cy - 15, 6, 10))
-    # Nose
-    pygame.draw.ellipse(screen, (200, 140, 110), (cx - 12, cy + 2, 24, 18))
-    # Mustache
-    pygame.draw.ellipse(screen, (60, 30, 10), (cx - 30, cy + 12, 60, 22))
-    # Ears
-    pygame.draw.circle(screen, (255, 190, 160), (cx - 55, cy - 5), 15)
-    pygame.draw.circle(screen, (255, 190, 160), (cx + 55, cy - 5), 15)
+    # Mario face (improved), baked once
+    if _title_face is None: _title_face = _build_title_face()
+    screen.blit(_title_face, (WIDTH // 2 - _FACE_CX, 310 - _FACE_CY))
 
     # Press Start blink
     if (frame // 30) % 2 == 0:
-        ps = fu.render("PRESS ENTER", True, (255, 255, 255))
-        pss = fu.render("PRESS ENTER", True, (60, 60, 60))
+        ps = rtext(fu, "PRESS ENTER", (255, 255, 255))
+        pss = rtext(fu, "PRESS ENTER", (60, 60, 60))
         screen.blit(pss, (WIDTH // 2 - ps.get_width() // 2 + 2, 472))
         screen.blit(ps, (WIDTH // 2 - ps.get_width() // 2, 470))
 
     # Footer
-    screen.blit(fs.render("v5.0 — All 27 Levels — 60fps — Procedural Audio — PC Port Physics", True, (120, 120, 160)),
+    screen.blit(rtext(fs, "v5.0 — All 27 Levels — 60fps — Procedural Audio — PC Port Physics", (120, 120, 160)),
                 (WIDTH // 2 - 230, HEIGHT - 30))
 
     # Controls hint
-    ctrl_txt = fs.render("WASD/Arrows=Move  Space=Jump  X=Punch  Z=Crouch  Q/E=Camera", True, (100, 100, 140))
+    ctrl_txt = rtext(fs, "WASD/Arrows=Move  Space=Jump  X=Punch  Z=Crouch  Q/E=Camera", (100, 100, 140))
     screen.blit(ctrl_txt, (WIDTH // 2 - ctrl_txt.get_width() // 2, HEIGHT - 55))
 
 # ============================================================================
@@ -1691,74 +1910,76 @@ def draw_select(screen, fonts, lflat, sel, mario, scr):
     screen.fill((15, 10, 35))
 
     # Title
-    tt = ft.render("SELECT COURSE", True, (255, 215, 0))
-    tts = ft.render("SELECT COURSE", True, (80, 60, 0))
+    tt = rtext(ft, "SELECT COURSE", (255, 215, 0))
+    tts = rtext(ft, "SELECT COURSE", (80, 60, 0))
     screen.blit(tts, (WIDTH // 2 - tt.get_width() // 2 + 2, 17))
     screen.blit(tt, (WIDTH // 2 - tt.get_width() // 2, 15))
 
     # Star count
-    screen.blit(fu.render(f"\u2605 x {mario.stars}", True, (255, 255, 100)), (WIDTH - 160, 20))
+    screen.blit(rtext(fu, f"\u2605 x {mario.stars}", (255, 255, 100)), (WIDTH - 160, 20))
 
-    yp = 75 - scr; idx = 0
+    # Row labels are collected and submitted in one batched blit after the highlight is drawn
+    yp = 75 - scr; idx = 0; rows = []
     for cn, lids in CATS:
         if -30 < yp < HEIGHT - 40:
-            ct = fs.render(cn, True, (150, 150, 200))
-            screen.blit(ct, (30, yp))
+            rows.append((rtext(fs, cn, (150, 150, 200)), (30, yp)))
         yp += 30
         for lid in lids:
             if -30 < yp < HEIGHT - 40:
                 info = LI[lid]; sel_ = idx == sel
-                nc = len(mario.lvl_stars.get(lid, set())); ns = info.nstars
+                nc = mario.lvl_star_count(lid); ns = info.nstars
                 ss = f"[{'★' * nc}{'☆' * max(0, ns - nc)}]" if ns > 0 else ""
                 col = (255, 215, 0) if sel_ else (180, 180, 180)
                 pre = "▶ " if sel_ else "   "
                 if sel_:
                     pygame.draw.rect(screen, (40, 30, 70), (50, yp - 2, WIDTH - 100, 26), border_radius=3)
-                txt = fu.render(f"{pre}{info.name}  {ss}", True, col)
-                screen.blit(txt, (55, yp))
+                rows.append((rtext(fu, f"{pre}{info.name}  {ss}", col), (55, yp)))
             yp += 30; idx += 1
         yp += 12
+    _fblits(screen, rows)
 
     # Footer
-    fc = fs.render("↑↓ Navigate   ENTER Select   ESC Back", True, (100, 100, 130))
+    fc = rtext(fs, "↑↓ Navigate   ENTER Select   ESC Back", (100, 100, 130))
     screen.blit(fc, (WIDTH // 2 - fc.get_width() // 2, HEIGHT - 30))
 
 # ============================================================================
 #  PAUSE / DEATH SCREENS
 # ============================================================================
+# The dimming overlay never changes, so it is built once instead of per pause frame
+_PAUSE_OV = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+_PAUSE_OV.fill((0, 0, 0, 160))
+
 def draw_pause(screen, fonts, mario):
     ft, fu, fs = fonts
-    ov = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    ov.fill((0, 0, 0, 160))
-    screen.blit(ov, (0, 0))
+    screen.blit(_PAUSE_OV, (0, 0))
 
-    pt = ft.render("PAUSE", True, (255, 255, 255))
-    pts = ft.render("PAUSE", True, (60, 60, 60))
+    pt = rtext(ft, "PAUSE", (255, 255, 255))
+    pts = rtext(ft, "PAUSE", (60, 60, 60))
     screen.blit(pts, (WIDTH // 2 - pt.get_width() // 2 + 3, 143))
     screen.blit(pt, (WIDTH // 2 - pt.get_width() // 2, 140))
 
     stats = [f"Stars: {mario.stars}", f"Coins: {mario.coins}",
              f"Lives: {mario.lives}", f"Level: {cur_name}"]
     for i, s in enumerate(stats):
-        st = fu.render(s, True, (220, 220, 220))
+        st = rtext(fu, s, (220, 220, 220))
         screen.blit(st, (WIDTH // 2 - 70, 240 + i * 40))
 
-    ft2 = fs.render("ESC Resume    Q Exit to Select", True, (150, 150, 150))
+    ft2 = rtext(fs, "ESC Resume    Q Exit to Select", (150, 150, 150))
     screen.blit(ft2, (WIDTH // 2 - ft2.get_width() // 2, 440))
 
 def draw_death(screen, fonts, mario, t):
     ft, fu, fs = fonts
     screen.fill((0, 0, 0))
     if t > 30:
-        go = ft.render("GAME OVER", True, (255, 50, 50))
-        gos = ft.render("GAME OVER", True, (80, 15, 15))
+        go = rtext(ft, "GAME OVER", (255, 50, 50))
+        gos = rtext(ft, "GAME OVER", (80, 15, 15))
         screen.blit(gos, (WIDTH // 2 - go.get_width() // 2 + 3, 203))
         screen.blit(go, (WIDTH // 2 - go.get_width() // 2, 200))
     if t > 60:
-        lt = fu.render(f"Lives: {mario.lives}", True, (200, 200, 200))
+        lt = rtext(fu, f"Lives: {mario.lives}", (200, 200, 200))
         screen.blit(lt, (WIDTH // 2 - lt.get_width() // 2, 300))
     if t > 90:
-        pt = fu.render("Press ENTER", True, (150, 150, 150))
+        pt = rtext(fu, "Press ENTER", (150, 150, 150))
         if (t // 20) % 2 == 0:
             screen.blit(pt, (WIDTH // 2 - pt.get_width() // 2, 400))
 
@@ -1805,7 +2026,7 @@ def main():
                         sel = (sel + 1) % len(lflat); scr = max(0, sel * 30 - 250)
                     elif ev.key == pygame.K_RETURN:
                         lid = lflat[sel]; info = LI[lid]; load_level(lid)
-                        mario.pos = info.start.copy(); mario.vel.set(0, 0, 0); mario.fvel = 0
+                        mario.pos = Vec3f(*info.start); mario.vel.set(0, 0, 0); mario.fvel = 0
                         mario.action = ACT_FREEFALL; mario.health = 0x880; mario.coins = 0
                         mario.punch_state = 0
                         cam = LakituCam()
@@ -1847,8 +2068,7 @@ def main():
             else:
                 ctrl.stick_mag = 0; mario.imag = 0
 
-            fn = ACT_MAP.get(mario.action, a_idle)
-            fn(mario, ctrl)
+            ACT_TBL[mario.action & ACT_ID_MASK](mario, ctrl)
 
             if mario.inv > 0: mario.inv -= 1
             if mario.hurt > 0: mario.hurt -= 1
@@ -1871,7 +2091,7 @@ def main():
             wr = interact_objs(mario)
             if wr and wr[0] == 'warp':
                 lid = wr[1]; info = LI[lid]; load_level(lid)
-                mario.pos = info.start.copy(); mario.vel.set(0, 0, 0); mario.fvel = 0
+                mario.pos = Vec3f(*info.start); mario.vel.set(0, 0, 0); mario.fvel = 0
                 mario.action = ACT_FREEFALL; mario.health = 0x880; mario.coins = 0
                 mario.punch_state = 0
                 cam = LakituCam()
@@ -1882,7 +2102,7 @@ def main():
                 mario.lives -= 1; dtimer = 0; state = GameState.DEATH
 
             if mario.pos.y < -3000:
-                mario.pos = LI.get(cur_lvl, LI[0]).start.copy()
+                mario.pos = Vec3f(*LI_FLAT[cur_lvl].start)
                 mario.vel.set(0, 0, 0); mario.fvel = 0
                 mario.action = ACT_FREEFALL; mario.take_dmg(0x100)
 
@@ -1907,7 +2127,7 @@ def main():
             draw_death(screen, fonts, mario, dtimer)
 
         # FPS counter
-        fps_txt = fs.render(f"FPS: {clock.get_fps():.0f}", True, (100, 100, 100))
+        fps_txt = rtext(fs, f"FPS: {clock.get_fps():.0f}", (100, 100, 100))
         screen.blit(fps_txt, (WIDTH - 80, HEIGHT - 25))
 
         pygame.display.flip()
@@ -9,6 +9,7 @@ import pygame
 import sys
 import math
 import random
+from functools import lru_cache
 
 # ============================================================
 # CONSTANTS
@@ -111,13 +112,12 @@ class V3:
         return V3(self.x, self.y, self.z)
 
 
-def project(pt, cam_pos, cam_yaw, cam_pitch):
-    d = pt - cam_pos
-    cy, sy = math.cos(-cam_yaw), math.sin(-cam_yaw)
-    rx = d.x * cy - d.z * sy
-    rz = d.x * sy + d.z * cy
-    ry = d.y
-    cp, sp = math.cos(-cam_pitch), math.sin(-cam_pitch)
+def project(pt, cam_pos, cy, sy, cp, sp):
+    dx = pt.x - cam_pos.x
+    dz = pt.z - cam_pos.z
+    rx = dx * cy - dz * sy
+    rz = dx * sy + dz * cy
+    ry = pt.y - cam_pos.y
     ry2 = ry * cp - rz * sp
     rz2 = ry * sp + rz * cp
     if rz2 < NEAR_CLIP:
@@ -127,6 +127,7 @@ def project(pt, cam_pos, cam_yaw, cam_pitch):
     return (int(sx), int(sy_)), rz2
 
 
+@lru_cache(maxsize=512)
 def shade(color, factor):
     return (max(0, min(255, int(color[0] * factor))),
             max(0, min(255, int(color[1] * factor))),
@@ -148,19 +149,24 @@ def make_box_faces(x, y, z, w, h, d, color):
 
 def render_faces(surface, faces, cam_pos, cam_yaw, cam_pitch):
     projected_faces = []
+    cy, sy = math.cos(-cam_yaw), math.sin(-cam_yaw)
+    cp, sp = math.cos(-cam_pitch), math.sin(-cam_pitch)
+    px, py, pz = cam_pos.x, cam_pos.y, cam_pos.z
     for verts, color, normal in faces:
-        face_center = V3(
-            sum(v.x for v in verts) / len(verts),
-            sum(v.y for v in verts) / len(verts),
-            sum(v.z for v in verts) / len(verts))
-        to_cam = cam_pos - face_center
-        if normal.dot(to_cam) < 0:
+        n = len(verts)
+        fx = fy = fz = 0
+        for v in verts:
+            fx += v.x
+            fy += v.y
+            fz += v.z
+        if (normal.x * (px - fx / n) + normal.y * (py - fy / n) +
+                normal.z * (pz - fz / n)) < 0:
             continue
         screen_pts = []
         total_depth = 0
         all_visible = True
         for v in verts:
-            pt, depth = project(v, cam_pos, cam_yaw, cam_pitch)
+            pt, depth = project(v, cam_pos, cy, sy, cp, sp)
             if pt is None:
                 all_visible = False
                 break
@@ -1088,13 +1094,15 @@ class Game:
             all_faces.extend(self.mario.get_faces())
 
         render_faces(self.screen, all_faces, cam_pos, cam_yaw, cam_pitch)
+        cos_y, sin_y = math.cos(-cam_yaw), math.sin(-cam_yaw)
+        cos_p, sin_p = math.cos(-cam_pitch), math.sin(-cam_pitch)
 
         shadow_pos = V3(self.mario.pos.x, 0.1, self.mario.pos.z)
         for plat in self.platforms:
             if plat.contains_xz(self.mario.pos.x, self.mario.pos.z):
                 shadow_pos.y = plat.top_y() + 0.05
                 break
-        sp, _ = project(shadow_pos, cam_pos, cam_yaw, cam_pitch)
+        sp, _ = project(shadow_pos, cam_pos, cos_y, sin_y, cos_p, sin_p)
         if sp and 0 < sp[0] < SW and 0 < sp[1] < SH:
             r = max(2, int(8 - abs(self.mario.pos.y - shadow_pos.y) * 0.3))
             pygame.draw.circle(self.screen, (0, 0, 0), sp, r)
@@ -1114,7 +1122,8 @@ class Game:
                 "11:WDW", "12:TTM", "13:THI", "14:TTC", "15:RR",
                 "BOWSER"]
             for i, (px, pz, cidx) in enumerate(self.course_portals):
-                pp, depth = project(V3(px, 4, pz), cam_pos, cam_yaw, cam_pitch)
+                pp, depth = project(V3(px, 4, pz), cam_pos,
+                                    cos_y, sin_y, cos_p, sin_p)
                 if pp and 0 < pp[0] < SW and 0 < pp[1] < SH and depth > 0:
                     label = portal_names[min(i, len(portal_names) - 1)]
                     collected = any(k[0] == cidx for k in self.stars_collected)